@@ -0,0 +1,251 @@
+import argparse
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from merkle import MerkleTree, hash_leaf, merkle_root as digests_root
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "bitcoin_blocks.json")
+
+# Bitcoin hashes tree nodes with double SHA-256 and pairs the last node of an
+# odd level with itself.
+HASH_NAME = "sha256d"
+
+# Serialized block header: version, previous block hash, Merkle root, time,
+# difficulty target and nonce, little-endian as in Bitcoin, 80 bytes
+HEADER = struct.Struct("<I32s32sIII")
+# A stored block: its header and transaction count, followed by the txids
+BLOCK_RECORD = struct.Struct("<80sI")
+DIGEST_SIZE = 32
+
+# Difficulty target of the first blocks, stored in synthetic headers as is
+GENESIS_BITS = 0x1D00FFFF
+BLOCK_SPACING = 600
+
+# Blocks verified per task by verify_chain()
+VERIFY_CHUNK = 2048
+
+
+def txids_to_digests(txids):
+    # Txids are displayed byte-reversed: reversing the hex of the reversed list
+    # as a whole puts every txid back into internal byte order in one pass.
+    return bytes.fromhex("".join(reversed(txids)))[::-1]
+
+
+def digest_to_hex(digest):
+    return bytes(digest)[::-1].hex()
+
+
+def txid(raw_transaction):
+    return digest_to_hex(hash_leaf(raw_transaction, HASH_NAME))
+
+
+def block_tree(txids):
+    """Build the Merkle tree of a block from its txids (as displayed)."""
+    return MerkleTree.from_digests(txids_to_digests(txids), HASH_NAME, duplicate_odd=True)
+
+
+def merkle_root(txids):
+    """Return the Merkle root of a block as it appears in its header (as displayed)."""
+    return digest_to_hex(block_tree(txids).root)
+
+
+class BlockHeader(namedtuple("BlockHeader", "version prev_hash merkle_root timestamp bits nonce")):
+    """Bitcoin block header, ``prev_hash`` and ``merkle_root`` in internal byte order."""
+
+    __slots__ = ()
+
+    @classmethod
+    def parse(cls, data):
+        return cls(*HEADER.unpack(data))
+
+    @classmethod
+    def from_fixture(cls, block):
+        return cls(
+            block["version"], bytes.fromhex(block["prev_hash"])[::-1], bytes.fromhex(block["merkle_root"])[::-1],
+            block["timestamp"], block["bits"], block["nonce"],
+        )
+
+    def serialize(self):
+        return HEADER.pack(*self)
+
+    def hash(self):
+        return hash_leaf(self.serialize(), HASH_NAME)
+
+    @property
+    def hexhash(self):
+        return digest_to_hex(self.hash())
+
+
+def build_chain(blocks, start_time, prev_hash=bytes(DIGEST_SIZE), spacing=BLOCK_SPACING, bits=GENESIS_BITS):
+    """Link a header over the txids (as displayed) of every block, each one ``spacing`` seconds after the last.
+
+    The headers are not mined, their nonce is 0.
+    """
+    headers = []
+    for height, txids in enumerate(blocks):
+        header = BlockHeader(1, prev_hash, block_tree(txids).root, start_time + height * spacing, bits, 0)
+        headers.append(header)
+        prev_hash = header.hash()
+    return headers
+
+
+def write_chain(path, blocks):
+    """Store ``(header, txid digests)`` pairs, the digests as one buffer in internal byte order."""
+    with open(path + ".partial", "wb") as f:
+        for header, digests in blocks:
+            f.write(BLOCK_RECORD.pack(header.serialize(), len(digests) // DIGEST_SIZE))
+            f.write(digests)
+    os.replace(path + ".partial", path)
+
+
+def block_offsets(path):
+    """Return the offset of every block in a chain file, and the file size."""
+    offsets = []
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        position = 0
+        while position < size:
+            offsets.append(position)
+            f.seek(position)
+            _, count = BLOCK_RECORD.unpack(f.read(BLOCK_RECORD.size))
+            position += BLOCK_RECORD.size + count * DIGEST_SIZE
+    return offsets, size
+
+
+def read_blocks(path, start=0, stop=None):
+    """Yield the ``(header, txid digests)`` of the blocks stored between two offsets."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(None if stop is None else stop - start)
+    view = memoryview(data)
+    position = 0
+    while position < len(view):
+        header, count = BLOCK_RECORD.unpack_from(view, position)
+        position += BLOCK_RECORD.size
+        yield BlockHeader.parse(header), view[position:position + count * DIGEST_SIZE]
+        position += count * DIGEST_SIZE
+
+
+def _verify_range(path, height, start, stop):
+    # Check the blocks of one range, return the previous hash of its first
+    # block, the hash of its last one and the problems found in between
+    problems = []
+    first = prev = None
+    for header, digests in read_blocks(path, start, stop):
+        if first is None:
+            first = header.prev_hash
+        elif header.prev_hash != prev:
+            problems.append((height, "does not link to the previous block"))
+        if digests_root(digests, HASH_NAME, duplicate_odd=True) != header.merkle_root:
+            problems.append((height, "Merkle root does not match its transactions"))
+        prev = header.hash()
+        height += 1
+    return first, prev, problems
+
+
+def verify_chain(path, workers=None, chunk_blocks=VERIFY_CHUNK):
+    """Check the links and Merkle roots of a stored chain, return the ``(height, problem)`` found.
+
+    The chain is split into ranges of blocks verified in parallel processes.
+    Each range checks its own links, the links between ranges are checked
+    once all are done.
+    """
+    offsets, size = block_offsets(path)
+    bounds = offsets[::chunk_blocks] + [size]
+    heights = range(0, len(offsets), chunk_blocks)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        ranges = list(pool.map(_verify_range, [path] * len(heights), heights, bounds, bounds[1:]))
+    problems = []
+    last = None
+    for height, (first, tip, range_problems) in zip(heights, ranges):
+        if last is not None and first != last:
+            problems.append((height, "does not link to the previous block"))
+        problems += range_problems
+        last = tip
+    return sorted(problems)
+
+
+def synthetic_blocks(count, transactions=16, start_time=1231006505):
+    """Yield ``(header, txid digests)`` for a linked chain of ``count`` blocks of made up transactions."""
+    prev_hash = bytes(DIGEST_SIZE)
+    for height in range(count):
+        digests = b"".join([hash_leaf(b"block %d tx %d" % (height, i), HASH_NAME) for i in range(transactions)])
+        header = BlockHeader(
+            1, prev_hash, digests_root(digests, HASH_NAME, duplicate_odd=True),
+            start_time + height * BLOCK_SPACING, GENESIS_BITS, 0,
+        )
+        yield header, digests
+        prev_hash = header.hash()
+
+
+def load_fixtures(path=FIXTURES):
+    with open(path) as f:
+        return json.load(f)
+
+
+def target(bits):
+    """Expand the compact difficulty target of a header."""
+    return (bits & 0xFFFFFF) << 8 * ((bits >> 24) - 3)
+
+
+def check_fixtures(path=FIXTURES):
+    """Check every fixture block against its header, return the problems found.
+
+    The Merkle root of the txids must match the header, the header must hash
+    to the block hash and that hash must meet the header's difficulty target.
+    """
+    problems = []
+    for block in load_fixtures(path):
+        header = BlockHeader.from_fixture(block)
+        if merkle_root(block["txids"]) != block["merkle_root"]:
+            problems.append((block["height"], "Merkle root does not match its transactions"))
+        if header.hexhash != block["hash"]:
+            problems.append((block["height"], f"header hashes to {header.hexhash}"))
+        if int(block["hash"], 16) > target(block["bits"]):
+            problems.append((block["height"], "hash does not meet the difficulty target"))
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the fixture blocks and time verifying a synthetic chain.")
+    parser.add_argument("--blocks", type=int, default=100_000, help="length of the synthetic chain, 0 to skip it")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="most processes to verify with")
+    parser.add_argument("--check", action="store_true", help="only check the fixture blocks, exit 1 on a problem")
+    args = parser.parse_args()
+
+    if args.check:
+        problems = check_fixtures()
+        for height, problem in problems:
+            print(f"block {height}: {problem}", file=sys.stderr)
+        sys.exit(1 if problems else 0)
+
+    for block in load_fixtures():
+        start = time.perf_counter()
+        root = merkle_root(block["txids"])
+        elapsed = time.perf_counter() - start
+        status = "ok" if root == block["merkle_root"] else f"MISMATCH {root}"
+        header = BlockHeader.from_fixture(block)
+        header_status = "ok" if header.hexhash == block["hash"] else f"MISMATCH {header.hexhash}"
+        print(f"block {block['height']}: {len(block['txids'])} txs, {status} in {elapsed * 1000:.2f}ms, header {header_status}")
+
+    if args.blocks:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "chain")
+            start = time.perf_counter()
+            write_chain(path, synthetic_blocks(args.blocks))
+            print(f"built a chain of {args.blocks} blocks in {time.perf_counter() - start:.1f}s")
+            jobs = 1
+            while True:
+                start = time.perf_counter()
+                problems = verify_chain(path, jobs)
+                status = "valid" if not problems else f"{len(problems)} problems"
+                print(f"verified with {jobs} processes in {time.perf_counter() - start:.2f}s, {status}")
+                if jobs >= args.jobs:
+                    break
+                jobs = min(jobs * 2, args.jobs)
@@ -0,0 +1,54 @@
+import json
+import os
+import re
+
+SLIDES_DIR = "slides"
+
+SECTION = re.compile(r"<section\b[^>]*>")
+VIDEO_ATTRIBUTE = re.compile(r'data-background-video="([^"]*)"')
+
+
+def slide_files(names, slides_dir=SLIDES_DIR):
+    """Return (scene index, slide index, video name) for every slide, in deck order."""
+    slides = []
+    for i, name in enumerate(names):
+        with open(os.path.join(slides_dir, f"{name}.json")) as f:
+            config = json.load(f)
+        slides += [(i, j, os.path.basename(slide["file"])) for j, slide in enumerate(config["slides"])]
+    return slides
+
+
+def assets_dir(output):
+    return f"{os.path.splitext(os.path.basename(output))[0]}_assets"
+
+
+def asset_path(html_dir, assets_dir, scene_index, scene_count, file_name):
+    # manim-slides prefixes the assets of multi-scene presentations with the
+    # scene index ("s0_", "s1_", ...), but 5.1.x does not write the prefixed
+    # name into the HTML.
+    if scene_count > 1:
+        prefixed = os.path.join(assets_dir, f"s{scene_index:0{len(str(scene_count - 1))}d}_{file_name}")
+        if os.path.exists(os.path.join(html_dir, prefixed)):
+            return prefixed
+    return os.path.join(assets_dir, file_name)
+
+
+def fix_asset_paths(names, output, slides_dir=SLIDES_DIR):
+    """Point every slide of a converted presentation at the video manim-slides copied for it."""
+    html_dir = os.path.dirname(os.path.abspath(output))
+    assets = assets_dir(output)
+    slides = slide_files(names, slides_dir)
+    with open(output) as f:
+        html = f.read()
+    sections = list(SECTION.finditer(html))
+    if len(sections) != len(slides):
+        raise ValueError(f"{output} has {len(sections)} slides, expected {len(slides)}")
+
+    parts, last = [], 0
+    for match, (scene_index, _, file_name) in zip(sections, slides):
+        video = asset_path(html_dir, assets, scene_index, len(names), file_name)
+        parts += [html[last:match.start()], VIDEO_ATTRIBUTE.sub(f'data-background-video="{video}"', match.group())]
+        last = match.end()
+    parts.append(html[last:])
+    with open(output, "w") as f:
+        f.write("".join(parts))
@@ -0,0 +1,149 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import av
+
+ASSETS_DIR = "assets"
+MANIFEST = "manifest.json"
+ASSET_ATTRIBUTE = re.compile(r'(data-background-(?:video|image))="([^"]+)"')
+
+# Video and images are compressed already, deflating them again only costs time
+STORED_EXTENSIONS = {".mp4", ".webm", ".png", ".jpg", ".jpeg"}
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _add_stream(container, template):
+    # PyAV 14 renamed add_stream(template=...)
+    if hasattr(container, "add_stream_from_template"):
+        return container.add_stream_from_template(template)
+    return container.add_stream(template=template)
+
+
+def remux_faststart(source, destination):
+    """Copy an mp4 with its index moved to the front, so browsers start playing before it is loaded.
+
+    Only the container is rewritten, the streams are copied without re-encoding.
+    """
+    with av.open(source) as src, av.open(destination, "w", format="mp4", options={"movflags": "faststart"}) as dst:
+        streams = {stream.index: _add_stream(dst, stream) for stream in src.streams}
+        for packet in src.demux():
+            # The demuxer ends every stream with an empty flushing packet
+            if packet.dts is None:
+                continue
+            packet.stream = streams[packet.stream.index]
+            dst.mux(packet)
+
+
+def publish_asset(source, destination):
+    if os.path.exists(destination):
+        # Named by content: an existing asset is already up to date
+        return False
+    partial = destination + ".partial"
+    try:
+        if destination.endswith(".mp4"):
+            remux_faststart(source, partial)
+        else:
+            shutil.copyfile(source, partial)
+    except av.error.FFmpegError:
+        shutil.copyfile(source, partial)
+    os.replace(partial, destination)
+    return True
+
+
+def export(html, out_dir, jobs=None, prune=False):
+    """Export a converted presentation to ``out_dir`` with content-hashed assets.
+
+    Every video segment and image referenced by the HTML is stored once as
+    ``assets/<sha256 prefix>.<ext>``, however many slides (or scenes) use it, and
+    index.html points at these names. Assets that already exist are left
+    untouched, so redeploying a changed deck only uploads the segments that
+    changed and browser and CDN caches stay valid for the others.
+    """
+    html_dir = os.path.dirname(os.path.abspath(html))
+    with open(html) as f:
+        content = f.read()
+    sources = sorted({path for _, path in ASSET_ATTRIBUTE.findall(content) if not path.startswith("data:")})
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        digests = dict(zip(sources, pool.map(lambda path: file_digest(os.path.join(html_dir, path)), sources)))
+        names = {
+            path: f"{ASSETS_DIR}/{digests[path][:32]}{os.path.splitext(path)[1].lower()}" for path in sources
+        }
+        os.makedirs(os.path.join(out_dir, ASSETS_DIR), exist_ok=True)
+        unique = {name: path for path, name in names.items()}
+        published = list(pool.map(
+            lambda item: publish_asset(os.path.join(html_dir, item[1]), os.path.join(out_dir, item[0])),
+            unique.items(),
+        ))
+
+    content = ASSET_ATTRIBUTE.sub(lambda m: f'{m[1]}="{names.get(m[2], m[2])}"', content)
+    with open(os.path.join(out_dir, "index.html"), "w") as f:
+        f.write(content)
+    with open(os.path.join(out_dir, MANIFEST), "w") as f:
+        json.dump({"assets": sorted(unique)}, f, indent=2)
+
+    removed = 0
+    if prune:
+        for name in os.listdir(os.path.join(out_dir, ASSETS_DIR)):
+            if f"{ASSETS_DIR}/{name}" not in unique:
+                os.remove(os.path.join(out_dir, ASSETS_DIR, name))
+                removed += 1
+    return {
+        "references": len(sources),
+        "assets": len(unique),
+        "new": sum(published),
+        "removed": removed,
+    }
+
+
+def write_archive(out_dir, archive):
+    """Zip an export, storing media as is and deflating only the text files."""
+    with open(os.path.join(out_dir, MANIFEST)) as f:
+        assets = json.load(f)["assets"]
+    with zipfile.ZipFile(archive, "w") as zf:
+        for name in ["index.html", MANIFEST, *assets]:
+            stored = os.path.splitext(name)[1].lower() in STORED_EXTENSIONS
+            zf.write(
+                os.path.join(out_dir, name),
+                name,
+                compress_type=zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED,
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a converted presentation with deduplicated, content-hashed assets.")
+    parser.add_argument("html", nargs="?", default="presentation.html")
+    parser.add_argument("out_dir", nargs="?", default="dist")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of assets processed at once")
+    parser.add_argument("--prune", action="store_true", help="remove assets the presentation no longer uses")
+    parser.add_argument("--zip", metavar="ARCHIVE", help="also write the export to this zip archive")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.html):
+        sys.exit(f"{args.html} not found, render and convert the presentation first")
+    stats = export(args.html, args.out_dir, args.jobs, args.prune)
+    print(
+        f"{stats['references']} asset references, {stats['assets']} unique assets, "
+        f"{stats['new']} new, {stats['removed']} removed"
+    )
+    if args.zip:
+        write_archive(args.out_dir, args.zip)
+        print(f"Wrote {args.zip}")
+
+
+if __name__ == "__main__":
+    main()
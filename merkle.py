@@ -0,0 +1,480 @@
+import hashlib
+import os
+import struct
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Number of node pairs hashed per batch, bounds the temporary digests kept alive
+# while a level is built.
+CHUNK_PAIRS = 1 << 16
+
+# Messages hashed per task by hash_leaves()
+CHUNK_LEAVES = 1 << 14
+
+# hashlib releases the GIL for inputs of at least this many bytes, smaller
+# messages only hash in parallel in separate processes.
+GIL_RELEASE_SIZE = 2048
+
+# Inclusion proof of the leaf at ``index`` in a tree of ``size`` leaves,
+# ``siblings`` are the sibling digests from the leaf level upwards. Levels
+# where the node has no sibling (it is promoted or hashed with itself)
+# contribute no digest.
+Proof = namedtuple("Proof", "index size siblings")
+
+# Proof for several leaves at once. ``indices`` are sorted and ``hashes`` holds
+# only the nodes the verifier cannot compute itself, in the order a bottom-up,
+# left-to-right pass over the tree needs them.
+MultiProof = namedtuple("MultiProof", "indices size hashes")
+
+
+def hash_function(hash_name="sha256"):
+    """Return a function mapping bytes to their digest.
+
+    Besides the hashlib algorithms, "sha256d" is the double SHA-256 Bitcoin uses.
+    """
+    if hash_name == "sha256d":
+        sha256 = hashlib.sha256
+        return lambda data: sha256(sha256(data).digest()).digest()
+    constructor = getattr(hashlib, hash_name, None)
+    if constructor is None:
+        return lambda data: hashlib.new(hash_name, data).digest()
+    return lambda data: constructor(data).digest()
+
+
+def hash_leaf(data, hash_name="sha256"):
+    return hash_function(hash_name)(data)
+
+
+def digest_size(hash_name="sha256"):
+    return len(hash_function(hash_name)(b""))
+
+
+def _hash_chunk(chunk, hash_name, record_size=0):
+    node_hash = hash_function(hash_name)
+    if record_size:
+        return b"".join([node_hash(chunk[i:i + record_size]) for i in range(0, len(chunk), record_size)])
+    return b"".join([node_hash(message) for message in chunk])
+
+
+def hash_leaves(messages, hash_name="sha256", record_size=0, workers=None, processes=None,
+                chunk_size=CHUNK_LEAVES):
+    """Hash many messages and return their digests as one contiguous buffer.
+
+    ``messages`` is a sequence of bytes-like objects, or a single buffer of
+    fixed-size records when ``record_size`` is given. Batches of
+    ``chunk_size`` messages are hashed on a thread pool when the messages are
+    large enough for hashlib to release the GIL and on a process pool
+    otherwise (force either with ``processes``). Small inputs are hashed
+    inline.
+    """
+    if record_size:
+        view = memoryview(messages).cast("B")
+        count = len(view) // record_size
+        if len(view) % record_size:
+            raise ValueError(f"buffer is not a multiple of {record_size} bytes")
+        step = chunk_size * record_size
+        chunks = [view[i:i + step] for i in range(0, count * record_size, step)]
+    else:
+        if not isinstance(messages, (list, tuple)):
+            messages = list(messages)
+        count = len(messages)
+        chunks = [messages[i:i + chunk_size] for i in range(0, count, chunk_size)]
+
+    workers = workers or os.cpu_count() or 1
+    if len(chunks) < 2 or workers == 1:
+        return b"".join([_hash_chunk(chunk, hash_name, record_size) for chunk in chunks])
+
+    if processes is None:
+        sample = messages[:64] if not record_size else [b"\0" * record_size]
+        processes = sum(len(message) for message in sample) < GIL_RELEASE_SIZE * len(sample)
+    if processes:
+        if record_size:
+            chunks = [bytes(chunk) for chunk in chunks]
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(chunks)))
+    else:
+        executor = ThreadPoolExecutor(max_workers=min(workers, len(chunks)))
+    with executor:
+        digests = executor.map(_hash_chunk, chunks, [hash_name] * len(chunks), [record_size] * len(chunks))
+        return b"".join(digests)
+
+
+def next_level(level, digest_size, node_hash, out=None, duplicate_odd=False):
+    """Hash a level of concatenated digests into its parent level.
+
+    Children are hashed pairwise, a trailing odd node is promoted unchanged or,
+    with ``duplicate_odd`` (as Bitcoin does), hashed with a copy of itself.
+    ``out`` may be ``level`` itself to build the parent level in place.
+    """
+    count = len(level) // digest_size
+    pairs = count // 2
+    size = (count + 1) // 2 * digest_size
+    if out is None:
+        out = bytearray(size)
+    step = 2 * digest_size
+    with memoryview(level) as view:
+        for start in range(0, pairs, CHUNK_PAIRS):
+            stop = min(start + CHUNK_PAIRS, pairs)
+            out[start * digest_size:stop * digest_size] = b"".join(
+                [node_hash(view[i:i + step]) for i in range(start * step, stop * step, step)]
+            )
+        if count % 2:
+            last = bytes(view[(count - 1) * digest_size:count * digest_size])
+            out[pairs * digest_size:size] = node_hash(last * 2) if duplicate_odd else last
+    if len(out) > size:
+        del out[size:]
+    return out
+
+
+def merkle_root(digests, hash_name="sha256", duplicate_odd=False):
+    """Compute the root over a buffer of leaf digests without keeping the levels.
+
+    The buffer is copied once and then reduced in place, so memory stays at the
+    size of the leaf level.
+    """
+    node_hash = hash_function(hash_name)
+    size = digest_size(hash_name)
+    level = bytearray(digests)
+    if not level:
+        return node_hash(b"")
+    while len(level) > size:
+        next_level(level, size, node_hash, out=level, duplicate_odd=duplicate_odd)
+    return bytes(level)
+
+
+def root_from_proof(leaf, proof, hash_name="sha256", duplicate_odd=False):
+    """Recompute the root implied by a leaf digest and its proof."""
+    node_hash = hash_function(hash_name)
+    index, count = proof.index, proof.size
+    if not 0 <= index < count:
+        raise ValueError(f"leaf {index} out of range for {count} leaves")
+    node = bytes(leaf)
+    siblings = iter(proof.siblings)
+    while count > 1:
+        if index ^ 1 < count:
+            sibling = next(siblings, None)
+            if sibling is None:
+                raise ValueError("proof is missing sibling digests")
+            node = node_hash(sibling + node if index & 1 else node + sibling)
+        elif duplicate_odd:
+            node = node_hash(node + node)
+        index //= 2
+        count = (count + 1) // 2
+    if next(siblings, None) is not None:
+        raise ValueError("proof has too many sibling digests")
+    return node
+
+
+def verify(leaf, proof, root, hash_name="sha256", duplicate_odd=False):
+    """Check that ``leaf`` is included at ``proof.index`` in the tree with ``root``."""
+    try:
+        return root_from_proof(leaf, proof, hash_name, duplicate_odd) == root
+    except ValueError:
+        return False
+
+
+def verify_batch(items, root, hash_name="sha256", duplicate_odd=False):
+    """Check many ``(leaf, proof)`` pairs against the same root.
+
+    The proofs are folded together level by level. Once two paths meet, the
+    rest of their proofs must be identical, so they are compared once and
+    continue as a single path: every shared interior node is hashed once.
+    """
+    node_hash = hash_function(hash_name)
+    items = list(items)
+    if not items:
+        return True
+    count = items[0][1].size
+    # Node index -> (digest, sibling digests, position of the next sibling)
+    paths = {}
+    for leaf, proof in items:
+        if proof.size != count or not 0 <= proof.index < count:
+            return False
+        path = (bytes(leaf), list(proof.siblings), 0)
+        if paths.setdefault(proof.index, path)[:2] != path[:2]:
+            return False
+
+    while count > 1:
+        parents = {}
+        for index, (node, siblings, position) in paths.items():
+            if index ^ 1 < count:
+                if position == len(siblings):
+                    return False
+                sibling = siblings[position]
+                other = paths.get(index ^ 1)
+                if other is not None:
+                    if other[0] != sibling or other[1][other[2] + 1:] != siblings[position + 1:]:
+                        return False
+                    if index & 1:
+                        # The left path hashes the shared parent
+                        continue
+                node = node_hash(sibling + node if index & 1 else node + sibling)
+                position += 1
+            elif duplicate_odd:
+                node = node_hash(node + node)
+            parents[index // 2] = (node, siblings, position)
+        paths = parents
+        count = (count + 1) // 2
+
+    node, siblings, position = paths[0]
+    return position == len(siblings) and node == root
+
+
+def root_from_multiproof(leaves, proof, hash_name="sha256", duplicate_odd=False):
+    """Recompute the root from the leaf digests covered by a multiproof."""
+    node_hash = hash_function(hash_name)
+    count = proof.size
+    indices = list(proof.indices)
+    leaves = list(leaves)
+    if not indices or len(leaves) != len(indices):
+        raise ValueError("expected one leaf digest per proven index")
+    if indices[0] < 0 or indices[-1] >= count or any(a >= b for a, b in zip(indices, indices[1:])):
+        raise ValueError("indices must be increasing and within the tree")
+    nodes = dict(zip(indices, map(bytes, leaves)))
+    hashes = iter(proof.hashes)
+    try:
+        while count > 1:
+            parents = {}
+            for index, node in nodes.items():
+                if index // 2 in parents:
+                    continue
+                if index ^ 1 >= count:
+                    parents[index // 2] = node_hash(node + node) if duplicate_odd else node
+                elif index & 1:
+                    parents[index // 2] = node_hash(next(hashes) + node)
+                else:
+                    sibling = nodes.get(index + 1)
+                    parents[index // 2] = node_hash(node + (next(hashes) if sibling is None else sibling))
+            nodes = parents
+            count = (count + 1) // 2
+    except StopIteration:
+        raise ValueError("multiproof is missing hashes") from None
+    if next(hashes, None) is not None:
+        raise ValueError("multiproof has too many hashes")
+    return nodes[0]
+
+
+def verify_many(leaves, proof, root, hash_name="sha256", duplicate_odd=False):
+    """Check that the leaf digests are included at ``proof.indices``."""
+    try:
+        return root_from_multiproof(leaves, proof, hash_name, duplicate_odd) == root
+    except ValueError:
+        return False
+
+
+class MerkleTree:
+    """Binary Merkle tree stored as one contiguous digest buffer per level.
+
+    ``levels[0]`` holds the leaf digests and ``levels[-1]`` the root. Parents
+    are the hash of their concatenated children, an odd node at the end of a
+    level is promoted to the next level as is, or hashed with a copy of itself
+    when ``duplicate_odd`` is set.
+    """
+
+    def __init__(self, leaves=(), hash_name="sha256", workers=None, duplicate_odd=False):
+        self._init(hash_leaves(leaves, hash_name, workers=workers), hash_name, duplicate_odd)
+
+    @classmethod
+    def from_digests(cls, digests, hash_name="sha256", duplicate_odd=False):
+        tree = cls.__new__(cls)
+        tree._init(digests, hash_name, duplicate_odd)
+        return tree
+
+    @classmethod
+    def from_levels(cls, levels, hash_name="sha256", duplicate_odd=False):
+        """Wrap already computed levels (leaves first) without copying or rehashing them.
+
+        Read-only buffers such as memoryviews of a mapped file give a tree that
+        can prove and verify but not be updated.
+        """
+        tree = cls.__new__(cls)
+        tree.hash_name = hash_name
+        tree.duplicate_odd = duplicate_odd
+        tree.node_hash = hash_function(hash_name)
+        tree.digest_size = digest_size(hash_name)
+        tree.levels = list(levels)
+        return tree
+
+    def _init(self, digests, hash_name, duplicate_odd):
+        self.hash_name = hash_name
+        self.duplicate_odd = duplicate_odd
+        self.node_hash = hash_function(hash_name)
+        self.digest_size = digest_size(hash_name)
+        if len(digests) % self.digest_size:
+            raise ValueError(f"digest buffer is not a multiple of {self.digest_size} bytes")
+        self.levels = [bytearray(digests)]
+        self._build()
+
+    def _build(self):
+        del self.levels[1:]
+        while len(self.levels[-1]) > self.digest_size:
+            self.levels.append(
+                next_level(self.levels[-1], self.digest_size, self.node_hash, duplicate_odd=self.duplicate_odd)
+            )
+
+    def _rehash(self, dirty):
+        # Recompute the ancestors of the dirty leaves, every node once per call
+        digest_size = self.digest_size
+        level = 0
+        while len(self.levels[level]) > digest_size:
+            below = self.levels[level]
+            if level + 1 == len(self.levels):
+                self.levels.append(bytearray())
+            above = self.levels[level + 1]
+            size = (len(below) // digest_size + 1) // 2 * digest_size
+            if len(above) < size:
+                above.extend(bytes(size - len(above)))
+            dirty = {index // 2 for index in dirty}
+            for parent in dirty:
+                left = 2 * parent * digest_size
+                if left + digest_size < len(below):
+                    node = self.node_hash(below[left:left + 2 * digest_size])
+                elif self.duplicate_odd:
+                    node = self.node_hash(below[left:left + digest_size] * 2)
+                else:
+                    node = below[left:left + digest_size]
+                above[parent * digest_size:(parent + 1) * digest_size] = node
+            level += 1
+
+    def update(self, index, data):
+        """Replace the leaf at ``index`` and rehash its path to the root."""
+        self.update_many([(index, data)])
+
+    def update_many(self, changes):
+        """Replace many leaves, given as a mapping or ``(index, data)`` pairs.
+
+        Paths shared by several changed leaves are rehashed once.
+        """
+        if hasattr(changes, "items"):
+            changes = changes.items()
+        digest_size = self.digest_size
+        leaves = self.levels[0]
+        dirty = set()
+        for index, data in changes:
+            if not 0 <= index < len(self):
+                raise IndexError(f"leaf {index} out of range")
+            leaves[index * digest_size:(index + 1) * digest_size] = self.node_hash(data)
+            dirty.add(index)
+        if dirty:
+            self._rehash(dirty)
+
+    def append(self, data):
+        """Add a leaf at the end, rehashing only the path of the new leaf."""
+        self.levels[0] += self.node_hash(data)
+        self._rehash({len(self) - 1})
+
+    def __len__(self):
+        return len(self.levels[0]) // self.digest_size
+
+    def node(self, level, index):
+        if not 0 <= index < len(self.levels[level]) // self.digest_size:
+            raise IndexError(f"node {index} out of range on level {level}")
+        return bytes(self.levels[level][index * self.digest_size:(index + 1) * self.digest_size])
+
+    def leaf(self, index):
+        return self.node(0, index)
+
+    def prove(self, index):
+        """Return the inclusion proof of the leaf at ``index``."""
+        if not 0 <= index < len(self):
+            raise IndexError(f"leaf {index} out of range")
+        siblings = []
+        node = index
+        for level in range(len(self.levels) - 1):
+            if (node ^ 1) * self.digest_size < len(self.levels[level]):
+                siblings.append(self.node(level, node ^ 1))
+            node //= 2
+        return Proof(index, len(self), siblings)
+
+    def prove_many(self, indices):
+        """Return one multiproof covering all leaves at ``indices``."""
+        indices = sorted(set(indices))
+        if not indices or indices[0] < 0 or indices[-1] >= len(self):
+            raise IndexError("leaf indices out of range")
+        hashes = []
+        nodes = indices
+        for level in range(len(self.levels) - 1):
+            count = len(self.levels[level]) // self.digest_size
+            present = set(nodes)
+            for index in nodes:
+                sibling = index ^ 1
+                if sibling < count and sibling not in present:
+                    hashes.append(self.node(level, sibling))
+            nodes = sorted({index // 2 for index in nodes})
+        return MultiProof(indices, len(self), hashes)
+
+    @property
+    def root(self):
+        if not len(self):
+            return self.node_hash(b"")
+        return bytes(self.levels[-1])
+
+    @property
+    def hexroot(self):
+        return self.root.hex()
+
+
+class MerkleAccumulator:
+    """Append-only Merkle root over an unbounded stream of leaves.
+
+    Only the roots of the perfect subtrees covering the leaves so far (the
+    "peaks", one per set bit of the leaf count) are kept, so memory is
+    O(log n) and an append costs one hash amortized. ``root`` equals the root
+    of a MerkleTree over the same leaves.
+    """
+
+    def __init__(self, hash_name="sha256"):
+        self.hash_name = hash_name
+        self.node_hash = hash_function(hash_name)
+        self.digest_size = digest_size(hash_name)
+        self.count = 0
+        self.peaks = []
+
+    def __len__(self):
+        return self.count
+
+    def append(self, data):
+        self.append_digest(self.node_hash(data))
+
+    def append_digest(self, digest):
+        node = bytes(digest)
+        count = self.count
+        # Merge equal sized peaks like carries in a binary counter
+        while count & 1:
+            node = self.node_hash(self.peaks.pop() + node)
+            count >>= 1
+        self.peaks.append(node)
+        self.count += 1
+
+    def extend(self, leaves):
+        digests = hash_leaves(leaves, self.hash_name)
+        for start in range(0, len(digests), self.digest_size):
+            self.append_digest(digests[start:start + self.digest_size])
+
+    @property
+    def root(self):
+        if not self.peaks:
+            return self.node_hash(b"")
+        node = self.peaks[-1]
+        for peak in reversed(self.peaks[:-1]):
+            node = self.node_hash(peak + node)
+        return node
+
+    @property
+    def hexroot(self):
+        return self.root.hex()
+
+    def checkpoint(self):
+        """Serialize the accumulator, see ``resume()``."""
+        return struct.pack(">Q", self.count) + b"".join(self.peaks)
+
+    @classmethod
+    def resume(cls, state, hash_name="sha256"):
+        accumulator = cls(hash_name)
+        (count,) = struct.unpack_from(">Q", state)
+        size = accumulator.digest_size
+        peaks = bytes(state[8:])
+        if len(peaks) != bin(count).count("1") * size:
+            raise ValueError("checkpoint does not match its leaf count")
+        accumulator.count = count
+        accumulator.peaks = [peaks[i:i + size] for i in range(0, len(peaks), size)]
+        return accumulator
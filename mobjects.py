@@ -0,0 +1,314 @@
+import numpy as np
+from manim import *
+
+from text_cache import cached_text
+
+# Parameters of the four bezier points (anchor, handle, handle, anchor) that
+# make a straight line one VMobject curve
+LINE_T = np.array([0, 1 / 3, 2 / 3, 1])
+
+
+def tree_layout(leaf_count, width=12, height=5):
+    """Return the node centers of a tree, one (count, 3) array per level from the leaves up.
+
+    Leaves are spread evenly over the width and every parent sits above the
+    middle of its children. A lone last node is carried up to the next level,
+    which places it right for both odd-node policies of MerkleTree.
+    """
+    x = np.linspace(-width / 2, width / 2, leaf_count) if leaf_count > 1 else np.zeros(leaf_count)
+    levels = [x]
+    while len(x) > 1:
+        pairs = len(x) // 2
+        parents = x[:2 * pairs].reshape(pairs, 2).mean(axis=1)
+        x = np.append(parents, x[-1]) if len(x) % 2 else parents
+        levels.append(x)
+    heights = np.linspace(-height / 2, height / 2, len(levels)) if len(levels) > 1 else np.zeros(len(levels))
+    return [np.column_stack([x, np.full(len(x), y), np.zeros(len(x))]) for x, y in zip(levels, heights)]
+
+
+def line_points(starts, ends):
+    """Points of one straight curve per (start, end) pair, ready for VMobject.set_points."""
+    return (starts[:, None, :] + (ends - starts)[:, None, :] * LINE_T[None, :, None]).reshape(-1, 3)
+
+
+def circle_points(centers, radius):
+    """Points of one closed circle subpath (four quarter arcs) per center."""
+    start = np.arange(4) * PI / 2
+    end = start + PI / 2
+    # Handle length of a cubic bezier approximating a quarter circle
+    kappa = 4 / 3 * (np.sqrt(2) - 1)
+    p0 = np.column_stack([np.cos(start), np.sin(start), np.zeros(4)])
+    p3 = np.column_stack([np.cos(end), np.sin(end), np.zeros(4)])
+    p1 = p0 + kappa * np.column_stack([-np.sin(start), np.cos(start), np.zeros(4)])
+    p2 = p3 - kappa * np.column_stack([-np.sin(end), np.cos(end), np.zeros(4)])
+    outline = np.stack([p0, p1, p2, p3], axis=1).reshape(-1, 3) * radius
+    return (centers[:, None, :] + outline[None, :, :]).reshape(-1, 3)
+
+
+def square_points(centers, size):
+    """Points of one closed square subpath per center."""
+    corners = np.array([[-1, -1, 0], [1, -1, 0], [1, 1, 0], [-1, 1, 0]]) * size / 2
+    outline = line_points(corners, np.roll(corners, -1, axis=0))
+    return (centers[:, None, :] + outline[None, :, :]).reshape(-1, 3)
+
+
+class MerkleTreeMobject(VGroup):
+    """A Merkle tree diagram of any size, laid out and drawn in a few NumPy passes.
+
+    All node outlines are subpaths of one VMobject (``nodes``) and all edges
+    are subpaths of another (``edges``), so building and animating a tree of
+    a thousand leaves costs about as much as one of four. Labels are only
+    created when ``label(level, index)`` is given, use them for small trees.
+    """
+
+    CURVES_PER_NODE = 4
+
+    def __init__(self, leaf_count, width=12, height=5, node_size=None, label=None, font_size=20,
+                 node_color=WHITE, edge_color=GREY_B, **kwargs):
+        super().__init__(**kwargs)
+        positions = tree_layout(leaf_count, width, height)
+        self.level_sizes = [len(level) for level in positions]
+        self.level_offsets = np.concatenate([[0], np.cumsum(self.level_sizes)])
+        if node_size is None:
+            node_size = min(1.0, 0.6 * width / max(leaf_count, 1), 0.6 * height / len(positions))
+        stroke_width = max(0.5, min(DEFAULT_STROKE_WIDTH, 8 * node_size))
+
+        self.nodes = VMobject(stroke_color=node_color, stroke_width=stroke_width)
+        self.nodes.set_points(square_points(np.concatenate(positions), node_size))
+
+        # Edge i of a level joins node i to its parent i // 2 on the next level
+        children = np.concatenate(positions[:-1]) if len(positions) > 1 else np.zeros((0, 3))
+        parents = np.concatenate([
+            above[np.arange(len(below)) // 2] for below, above in zip(positions, positions[1:])
+        ]) if len(positions) > 1 else np.zeros((0, 3))
+        offset = np.array([0, node_size / 2, 0])
+        self.edges = VMobject(stroke_color=edge_color, stroke_width=stroke_width)
+        self.edges.set_points(line_points(children + offset, parents - offset))
+
+        self.labels = VGroup()
+        if label is not None:
+            for level, centers in enumerate(positions):
+                for index, center in enumerate(centers):
+                    self.labels.add(cached_text(label(level, index), font_size=font_size).move_to(center))
+        self.add(self.edges, self.nodes, self.labels)
+
+    @classmethod
+    def from_tree(cls, tree, hash_length=None, **kwargs):
+        """Draw a MerkleTree, labelling every node with its hash when hash_length is given."""
+        if hash_length:
+            kwargs["label"] = lambda level, index: tree.node(level, index).hex()[:hash_length].upper()
+        return cls(len(tree), **kwargs)
+
+    def _node_curves(self, level, index):
+        if not 0 <= index < self.level_sizes[level]:
+            raise IndexError(f"node {index} out of range on level {level}")
+        start = (self.level_offsets[level] + index) * self.CURVES_PER_NODE * 4
+        return self.nodes.points[start:start + self.CURVES_PER_NODE * 4]
+
+    def node_center(self, level, index):
+        # The first point of every side is a corner, their mean is the center.
+        # Reading it from the points keeps it right after the tree was moved.
+        return self._node_curves(level, index)[::4].mean(axis=0)
+
+    def node_width(self):
+        corners = self._node_curves(0, 0)[::4]
+        return np.linalg.norm(corners[1] - corners[0])
+
+    def node_square(self, level, index, **kwargs):
+        """A Square covering one node, e.g. to highlight it or to label it."""
+        return Square(side_length=self.node_width(), **kwargs).move_to(self.node_center(level, index))
+
+    def path_edges(self, index, **kwargs):
+        """One VMobject with the edges from leaf ``index`` up to the root."""
+        points = []
+        for level in range(len(self.level_sizes) - 1):
+            start = (self.level_offsets[level] + index) * 4
+            points.append(self.edges.points[start:start + 4])
+            index //= 2
+        path = VMobject(**kwargs)
+        if points:
+            path.set_points(np.concatenate(points))
+        return path
+
+
+class ProofTreeMobject(VGroup):
+    """The inclusion proof of one leaf, drawn inside a tree of any size.
+
+    Only the root, the path from the leaf up and the proof siblings along it
+    are drawn. The subtree under every sibling is collapsed into one triangle
+    labelled with its hash and the number of leaves it summarises, so the
+    diagram costs O(log n) mobjects whatever the size of the tree.
+    ``label(level, index)`` formats node hashes, hex by default.
+    """
+
+    def __init__(self, tree, index, height=6, spacing=2.4, node_width=1.6, hash_length=8, font_size=16,
+                 label=None, path_color=YELLOW, sibling_color=BLUE, root_color=GREEN, **kwargs):
+        super().__init__(**kwargs)
+        if not 0 <= index < len(tree):
+            raise IndexError(f"leaf {index} out of range")
+        if label is None:
+            label = lambda level, i: tree.node(level, i).hex()[:hash_length].upper()
+        levels = len(tree.levels)
+        step = height / max(levels - 1, 1)
+        node_height = 0.5 * step
+
+        self.path_nodes = VGroup()
+        self.siblings = VGroup()
+        self.labels = VGroup()
+        starts, ends = [], []
+        for level in range(levels):
+            node = index >> level
+            center = np.array([0, -height / 2 + level * step, 0])
+            color = root_color if level == levels - 1 else path_color
+            box = Rectangle(width=node_width, height=node_height, color=color).move_to(center)
+            self.path_nodes.add(box)
+            self.labels.add(cached_text(label(level, node), font_size=font_size).move_to(box))
+            if level == levels - 1:
+                break
+
+            top = center + UP * node_height / 2
+            parent_bottom = center + UP * (step - node_height / 2)
+            starts.append(top)
+            ends.append(parent_bottom)
+
+            sibling = node ^ 1
+            if sibling * tree.digest_size >= len(tree.levels[level]):
+                # A lone last node has no sibling, it only moves up
+                continue
+            side = RIGHT if node % 2 == 0 else LEFT
+            if level == 0:
+                shape = Rectangle(width=node_width, height=node_height, color=sibling_color)
+                text = cached_text(label(level, sibling), font_size=font_size)
+                shape.move_to(center + side * spacing)
+                text.move_to(shape)
+            else:
+                leaves = min((sibling + 1) << level, len(tree)) - (sibling << level)
+                shape = Triangle(color=sibling_color).stretch_to_fit_width(node_height * 1.6)
+                shape.stretch_to_fit_height(node_height)
+                text = cached_text(f"{label(level, sibling)}\n{leaves} leaves", font_size=font_size)
+                shape.move_to(center + side * spacing)
+                text.next_to(shape, side, buff=0.15)
+            # In the order of the proof's siblings
+            self.siblings.add(VGroup(shape, text))
+            starts.append(shape.get_top())
+            ends.append(parent_bottom)
+
+        self.edges = VMobject(stroke_color=GREY_B)
+        self.edges.set_points(line_points(np.array(starts), np.array(ends)) if starts else np.zeros((0, 3)))
+        self.add(self.edges, self.path_nodes, self.labels, self.siblings)
+
+
+class NetworkGraph(VGroup):
+    """A peer-to-peer network drawn as two VMobjects, whatever its size.
+
+    Node positions are an (n, 3) array and edges an (m, 2) array of node
+    indices. All nodes are circle subpaths of ``nodes`` and all edges line
+    subpaths of ``edges``; parts of the graph that need their own style
+    (one node, the nodes reached by a gossip round) are cut out of these
+    batches with node_dot, nodes_subset and edges_subset.
+    """
+
+    POINTS_PER_NODE = 16
+
+    def __init__(self, positions, edges, node_radius=0.1, node_color=BLUE, edge_color=WHITE, edge_width=2,
+                 **kwargs):
+        super().__init__(**kwargs)
+        positions = np.asarray(positions, dtype=float)
+        if positions.shape[1] == 2:
+            positions = np.column_stack([positions, np.zeros(len(positions))])
+        self.edge_index = np.asarray(edges, dtype=int).reshape(-1, 2)
+        self.node_radius = node_radius
+
+        self.nodes = VMobject(fill_color=node_color, fill_opacity=1, stroke_width=0)
+        self.nodes.set_points(circle_points(positions, node_radius))
+        self.edges = VMobject(stroke_color=edge_color, stroke_width=edge_width)
+        self.edges.set_points(line_points(positions[self.edge_index[:, 0]], positions[self.edge_index[:, 1]]))
+        self.add(self.edges, self.nodes)
+
+    @classmethod
+    def ring(cls, count, radius=2, extra_edges=0, center=ORIGIN, seed=None, **kwargs):
+        """Nodes on a circle, each linked to the next, plus random chords."""
+        angles = np.linspace(0, 2 * PI, count, endpoint=False)
+        positions = center + radius * np.column_stack([np.cos(angles), np.sin(angles), np.zeros(count)])
+        ring = np.column_stack([np.arange(count), (np.arange(count) + 1) % count])
+        chords = np.random.default_rng(seed).integers(0, count, size=(extra_edges, 2))
+        chords = chords[chords[:, 0] != chords[:, 1]]
+        return cls(positions, np.concatenate([ring, chords]), **kwargs)
+
+    @classmethod
+    def random_geometric(cls, count, width=12, height=6, neighbours=3, shortcuts=0, center=ORIGIN, seed=None,
+                         **kwargs):
+        """Randomly placed nodes, each linked to its nearest neighbours and by a few random shortcuts."""
+        rng = np.random.default_rng(seed)
+        positions = center + np.column_stack([
+            rng.uniform(-width / 2, width / 2, count), rng.uniform(-height / 2, height / 2, count), np.zeros(count)
+        ])
+        neighbours = min(neighbours, count - 1)
+        edges = []
+        # Distances are computed in blocks of rows to bound memory for large graphs
+        for first in range(0, count, 1024):
+            block = positions[first:first + 1024]
+            distances = np.linalg.norm(block[:, None, :2] - positions[None, :, :2], axis=2)
+            distances[np.arange(len(block)), np.arange(first, first + len(block))] = np.inf
+            nearest = np.argpartition(distances, neighbours - 1, axis=1)[:, :neighbours]
+            edges.append(np.column_stack([np.repeat(np.arange(first, first + len(block)), neighbours), nearest.ravel()]))
+        edges.append(rng.integers(0, count, size=(shortcuts, 2)))
+        edges = np.sort(np.concatenate(edges), axis=1)
+        edges = edges[edges[:, 0] != edges[:, 1]]
+        return cls(positions, np.unique(edges, axis=0), **kwargs)
+
+    @property
+    def node_count(self):
+        return len(self.nodes.points) // self.POINTS_PER_NODE
+
+    def _node_points(self):
+        return self.nodes.points.reshape(-1, self.POINTS_PER_NODE, 3)
+
+    def node_center(self, index):
+        # Read from the points so it follows the graph when it is moved
+        return self._node_points()[index, ::4].mean(axis=0)
+
+    def node_dot(self, index, **kwargs):
+        """A Dot on top of one node, e.g. to highlight it."""
+        points = self._node_points()[index]
+        radius = np.linalg.norm(points[0] - points[::4].mean(axis=0))
+        kwargs.setdefault("color", self.nodes.get_fill_color())
+        return Dot(points[::4].mean(axis=0), radius=radius, **kwargs)
+
+    def nodes_subset(self, mask, **kwargs):
+        """One VMobject with the nodes selected by a boolean mask or index array."""
+        kwargs.setdefault("fill_opacity", 1)
+        kwargs.setdefault("stroke_width", 0)
+        subset = VMobject(**kwargs)
+        subset.set_points(self._node_points()[mask].reshape(-1, 3))
+        return subset
+
+    def edges_subset(self, mask, **kwargs):
+        """One VMobject with the edges selected by a boolean mask or index array."""
+        kwargs.setdefault("stroke_width", self.edges.get_stroke_width())
+        subset = VMobject(**kwargs)
+        subset.set_points(self.edges.points.reshape(-1, 4, 3)[mask].reshape(-1, 3))
+        return subset
+
+    def hops(self, source):
+        """Gossip round in which every node first hears from ``source``, -1 if never."""
+        count = self.node_count
+        a = np.concatenate([self.edge_index[:, 0], self.edge_index[:, 1]])
+        b = np.concatenate([self.edge_index[:, 1], self.edge_index[:, 0]])
+        hops = np.full(count, -1)
+        hops[source] = 0
+        frontier = np.zeros(count, dtype=bool)
+        frontier[source] = True
+        hop = 0
+        while frontier.any():
+            hop += 1
+            reached = np.zeros(count, dtype=bool)
+            reached[b[frontier[a]]] = True
+            frontier = reached & (hops < 0)
+            hops[frontier] = hop
+        return hops
+
+    def gossip_edges(self, hops, hop):
+        """Mask of the edges a message travels along in gossip round ``hop``."""
+        a, b = hops[self.edge_index[:, 0]], hops[self.edge_index[:, 1]]
+        return ((a == hop - 1) & (b == hop)) | ((b == hop - 1) & (a == hop))
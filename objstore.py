@@ -0,0 +1,273 @@
+import argparse
+import os
+import pickle
+import stat
+import struct
+import time
+import zlib
+
+from merkle import digest_size, hash_function
+
+# Pack object types, numbered as in Git packs
+COMMIT, TREE, BLOB = 1, 2, 3
+KIND_NAMES = {COMMIT: b"commit", TREE: b"tree", BLOB: b"blob"}
+
+# Tree entry modes
+FILE_MODE, EXECUTABLE_MODE, LINK_MODE, TREE_MODE = b"100644", b"100755", b"120000", b"40000"
+
+PACK_FILE = "objects.pack"
+INDEX_FILE = "objects.idx"
+STAT_CACHE_FILE = "stat_cache"
+HEAD_FILE = "HEAD"
+
+# A packed object: its type and compressed size, followed by the zlib data
+RECORD = struct.Struct(">BI")
+# An index entry after the object id: where the record starts in the pack
+OFFSET = struct.Struct(">Q")
+
+IGNORED_NAMES = {".git"}
+
+
+def object_id(kind, data, hash_name="sha1"):
+    """Id of an object, hashed like Git over a "<type> <size>\\0" header and the content.
+
+    With the default SHA-1 blob and tree ids match ``git hash-object`` and ``git write-tree``.
+    """
+    return hash_function(hash_name)(b"%s %d\0" % (KIND_NAMES[kind], len(data)) + data)
+
+
+def tree_entries(data, size=20):
+    """Parse tree object data into (mode, name, object id) triples."""
+    entries = []
+    position = 0
+    while position < len(data):
+        space = data.index(b" ", position)
+        end = data.index(b"\0", space)
+        entries.append((data[position:space], data[space + 1:end], data[end + 1:end + 1 + size]))
+        position = end + 1 + size
+    return entries
+
+
+class ObjectStore:
+    """Content-addressed store of Git-style blob, tree and commit objects.
+
+    Objects are zlib compressed and appended to a single pack file, an
+    identical object is only ever stored once. An append-only index of
+    (object id, pack offset) records is loaded into a dict when the store is
+    opened, so looking up an object is one dict access and one read.
+    """
+
+    def __init__(self, path, hash_name="sha1"):
+        self.path = os.path.abspath(path)
+        self.hash_name = hash_name
+        self.digest_size = digest_size(hash_name)
+        os.makedirs(self.path, exist_ok=True)
+        self._offsets = self._read_index()
+        self._pack = open(os.path.join(self.path, PACK_FILE), "ab")
+        self._index = open(os.path.join(self.path, INDEX_FILE), "ab")
+        self._reader = open(os.path.join(self.path, PACK_FILE), "rb")
+
+    def _read_index(self):
+        entry_size = self.digest_size + OFFSET.size
+        try:
+            with open(os.path.join(self.path, INDEX_FILE), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return {}
+        # A record cut short by a crash is ignored, its object is rewritten when needed
+        offsets = {}
+        for position in range(0, len(data) - len(data) % entry_size, entry_size):
+            oid = data[position:position + self.digest_size]
+            offsets[oid] = OFFSET.unpack_from(data, position + self.digest_size)[0]
+        return offsets
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._pack.close()
+        self._index.close()
+        self._reader.close()
+
+    def flush(self):
+        # The pack goes first, the index never points past the data written
+        self._pack.flush()
+        self._index.flush()
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __contains__(self, oid):
+        return oid in self._offsets
+
+    def put(self, kind, data):
+        """Store an object unless it already exists, return its id."""
+        oid = object_id(kind, data, self.hash_name)
+        if oid not in self._offsets:
+            compressed = zlib.compress(data, 1)
+            offset = self._pack.tell()
+            self._pack.write(RECORD.pack(kind, len(compressed)) + compressed)
+            self._index.write(oid + OFFSET.pack(offset))
+            self._offsets[oid] = offset
+        return oid
+
+    def get(self, oid):
+        """Return the (type, data) of an object."""
+        offset = self._offsets.get(oid)
+        if offset is None:
+            raise KeyError(f"no object {oid.hex()}")
+        self._pack.flush()
+        kind, length = RECORD.unpack(os.pread(self._reader.fileno(), RECORD.size, offset))
+        return kind, zlib.decompress(os.pread(self._reader.fileno(), length, offset + RECORD.size))
+
+    def commit(self, tree, message, parents=(), author="Merkle Tree Presentation <merkle@example.com>",
+               timestamp=None):
+        """Store a commit of ``tree`` and return its id."""
+        timestamp = int(time.time()) if timestamp is None else timestamp
+        lines = [b"tree " + tree.hex().encode()]
+        lines += [b"parent " + parent.hex().encode() for parent in parents]
+        signature = b"%s %d +0000" % (author.encode(), timestamp)
+        lines += [b"author " + signature, b"committer " + signature]
+        return self.put(COMMIT, b"\n".join(lines) + b"\n\n" + message.encode() + b"\n")
+
+    @property
+    def head(self):
+        try:
+            with open(os.path.join(self.path, HEAD_FILE)) as f:
+                return bytes.fromhex(f.read().strip())
+        except FileNotFoundError:
+            return None
+
+    @head.setter
+    def head(self, oid):
+        path = os.path.join(self.path, HEAD_FILE)
+        with open(path + ".partial", "w") as f:
+            f.write(oid.hex() + "\n")
+        os.replace(path + ".partial", path)
+
+    def _load_stat_cache(self):
+        try:
+            with open(os.path.join(self.path, STAT_CACHE_FILE), "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return 0, {}
+
+    def _save_stat_cache(self, started, entries):
+        path = os.path.join(self.path, STAT_CACHE_FILE)
+        with open(path + ".partial", "wb") as f:
+            pickle.dump((started, entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".partial", path)
+
+    def snapshot(self, root):
+        """Store the directory tree at ``root`` and return the id of its tree object.
+
+        Every file's (mtime, size, inode, mode) is kept in a stat cache, files
+        whose stat did not change since the previous snapshot reuse their blob
+        id without being read. Files modified after the previous snapshot
+        started are always read again: within the timestamp resolution a later
+        write could leave the same stat behind.
+        """
+        started = time.time_ns()
+        self._previous_start, self._previous = self._load_stat_cache()
+        self._current = {}
+        tree = self._snapshot_dir(os.path.abspath(root), "")
+        if tree is None:
+            tree = self.put(TREE, b"")
+        self.flush()
+        self._save_stat_cache(started, self._current)
+        del self._previous, self._current
+        return tree
+
+    def _blob_id(self, path, relpath, info, mode):
+        key = (info.st_mtime_ns, info.st_size, info.st_ino, mode)
+        cached = self._previous.get(relpath)
+        if cached is not None and cached[:4] == key and info.st_mtime_ns < self._previous_start \
+                and cached[4] in self._offsets:
+            oid = cached[4]
+        else:
+            if mode == LINK_MODE:
+                data = os.fsencode(os.readlink(path))
+            else:
+                with open(path, "rb") as f:
+                    data = f.read()
+            oid = self.put(BLOB, data)
+        self._current[relpath] = key + (oid,)
+        return oid
+
+    def _snapshot_dir(self, path, prefix):
+        # Entries sort like Git's, as if directory names ended with "/"
+        entries = []
+        with os.scandir(path) as scan:
+            for entry in scan:
+                if entry.name in IGNORED_NAMES or entry.path == self.path:
+                    continue
+                name = os.fsencode(entry.name)
+                relpath = prefix + entry.name
+                try:
+                    info = entry.stat(follow_symlinks=False)
+                    if stat.S_ISDIR(info.st_mode):
+                        oid = self._snapshot_dir(entry.path, relpath + "/")
+                        if oid is not None:
+                            entries.append((name + b"/", TREE_MODE, name, oid))
+                        continue
+                    if stat.S_ISLNK(info.st_mode):
+                        mode = LINK_MODE
+                    elif stat.S_ISREG(info.st_mode):
+                        mode = EXECUTABLE_MODE if info.st_mode & 0o111 else FILE_MODE
+                    else:
+                        continue
+                    entries.append((name, mode, name, self._blob_id(entry.path, relpath, info, mode)))
+                except FileNotFoundError:
+                    # Removed while walking
+                    continue
+        if not entries:
+            # Like Git, empty directories are not stored
+            return None
+        entries.sort()
+        return self.put(TREE, b"".join([mode + b" " + name + b"\0" + oid for _, mode, name, oid in entries]))
+
+    def checkout(self, tree, path):
+        """Write the files of a tree object below ``path``."""
+        os.makedirs(path, exist_ok=True)
+        for mode, name, oid in tree_entries(self.get(tree)[1], self.digest_size):
+            target = os.path.join(path, os.fsdecode(name))
+            if mode == TREE_MODE:
+                self.checkout(oid, target)
+            elif mode == LINK_MODE:
+                os.symlink(os.fsdecode(self.get(oid)[1]), target)
+            else:
+                with open(target, "wb") as f:
+                    f.write(self.get(oid)[1])
+                if mode == EXECUTABLE_MODE:
+                    os.chmod(target, 0o755)
+
+
+def _walk(path):
+    count = 0
+    for _, _, files in os.walk(path):
+        count += len(files)
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snapshot a directory twice and compare with a plain walk.")
+    parser.add_argument("directory")
+    parser.add_argument("--store", default=".objects")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    files = _walk(args.directory)
+    print(f"walked {files} files in {time.perf_counter() - start:.2f}s")
+    with ObjectStore(args.store) as store:
+        for attempt in ("first", "second"):
+            count = len(store)
+            start = time.perf_counter()
+            tree = store.snapshot(args.directory)
+            store.head = store.commit(tree, f"{attempt} snapshot", [store.head] if store.head else [])
+            print(
+                f"{attempt} snapshot {tree.hex()} in {time.perf_counter() - start:.2f}s, "
+                f"{len(store) - count} new objects"
+            )
@@ -1,2 +1,2 @@
 #!/bin/zsh
-manim-slides render presentation.py MerkleTreePresentation && manim-slides convert MerkleTreePresentation presentation.html --open
\ No newline at end of file
+python render.py --open
\ No newline at end of file
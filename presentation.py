@@ -1,34 +1,182 @@
 import datetime
-import random
+import os
+import sys
 
 from manim import *
+from manim.utils.exceptions import EndSceneEarlyException
 from manim_slides import Slide
-import hashlib
+
+from bitcoin import block_tree, build_chain, digest_to_hex, txid
+from merkle import MerkleTree, hash_leaf, root_from_proof
+from mobjects import NetworkGraph
+from profiling import PROFILE_ENV, RenderProfiler
+from reproducible import deterministic, make_rng, render_clock, seed_everything
+from stills import write_stills
+from text_cache import cached_text
 
 TITLE_FONT_SIZE = 50
 
+# Trees behind the hash labels shown on the slides
+TORRENT_TREE = MerkleTree(f"Chunk {i + 1}".encode() for i in range(4))
+BLOCK_TXIDS = [txid(f"Tx {i + 1}".encode()) for i in range(16)]
+BLOCK_TREE = block_tree(BLOCK_TXIDS)
+SPV_TREE = block_tree(BLOCK_TXIDS[:4])
+PREV_BLOCK_TXIDS = [txid(f"Earlier Tx {i + 1}".encode()) for i in range(16)]
+
+# Chapters of the deck in order with the first and last slide they cover,
+# numbered like the slides in the README (10 and 12 are skipped)
+CHAPTERS = [
+    (1, 1, "Title Slide"),
+    (2, 2, "Agenda"),
+    (3, 3, "The Problem"),
+    (4, 5, "Introduction to Hash Functions"),
+    (6, 6, "Building Blocks of Merkle Trees"),
+    (7, 7, "What is a Merkle Tree?"),
+    (8, 8, "How Merkle Trees Work"),
+    (9, 9, "Example Usage - BitTorrent"),
+    (11, 11, "Example Usage - Bitcoin"),
+    (11, 11, "Bitcoin SPV"),
+    (13, 13, "Benefits of Merkle Trees"),
+    (14, 14, "Questions"),
+    (15, 15, "Quiz Time"),
+]
+CHAPTER_TITLES = [title for _, _, title in CHAPTERS]
+
+# Set by preview.py to "first:last", the indices of the chapters to encode
+PREVIEW_ENV = "MERKLE_PREVIEW"
+
+
+def short_hash(digest, length=8):
+    return digest.hex()[:length].upper()
+
+
+def node_label(level, index):
+    # Name a node after the leaves below it, e.g. "h34" for the parent of leaf 3 and 4
+    first = index << level
+    return "h" + "".join(str(i + 1) for i in range(first, first + (1 << level)))
+
 
 def create_title(txt):
-    return Text(
+    return cached_text(
         txt,
         font_size=TITLE_FONT_SIZE,
         weight=BOLD
     ).to_edge(UP)
 
 
-class MerkleTreePresentation(Slide):
-    def construct(self):
+def create_logo():
+    logo = ImageMobject("img/company_logo.png")
+    logo.scale(0.3)
+    logo.to_corner(DR)
+    return logo
+
+
+class MerkleTreeSlide(Slide):
+    # Each section method expects the previous section's title on screen and
+    # returns the title it leaves behind, so sections can be chained into the
+    # full deck or rendered on their own (see the *Section scenes below).
+
+    def setup(self):
+        super().setup()
+        preview = os.environ.get(PREVIEW_ENV)
+        self.preview = tuple(int(i) for i in preview.split(":")) if preview else None
+        if self.preview:
+            # Fast-forward: animations before the previewed chapters only build
+            # up the scene, manim skips them without encoding any frames.
+            config.from_animation_number = sys.maxsize
+        # Random choices of the slides, seeded in deterministic mode
+        self.rng = make_rng()
+        if deterministic():
+            seed_everything()
+        profile_dir = os.environ.get(PROFILE_ENV)
+        self.profiler = RenderProfiler(profile_dir) if profile_dir else None
+        # End animation numbers of the slides that only hold a frame
+        self.still_slides = set()
+        self._animated = False
+        self._slide_mobjects = []
+
+    def play(self, *args, **kwargs):
+        if not all(isinstance(animation, Wait) for animation in args) or self.should_update_mobjects():
+            self._animated = True
+        if self.profiler is None:
+            return super().play(*args, **kwargs)
+        self.profiler.start(self, "play", args, sys._getframe(1).f_lineno)
+        try:
+            super().play(*args, **kwargs)
+        finally:
+            self.profiler.stop(self)
+
+    def wait(self, *args, **kwargs):
+        if self.profiler is None:
+            return super().wait(*args, **kwargs)
+        self.profiler.start(self, "wait", (), sys._getframe(1).f_lineno)
+        try:
+            super().wait(*args, **kwargs)
+        finally:
+            self.profiler.stop(self)
+
+    def next_slide(self, *args, **kwargs):
+        if self._current_animation == self._start_animation and self.mobjects != self._slide_mobjects:
+            # manim-slides drops slides without animations, so a slide that was
+            # only built with self.add() holds its frame for a single frame.
+            self.wait(1 / config.frame_rate)
+        self._end_slide()
+        super().next_slide(*args, **kwargs)
+        self._slide_mobjects = list(self.mobjects)
+
+    def _end_slide(self):
+        if self._current_animation > self._start_animation and not self._animated:
+            self.still_slides.add(self._current_animation)
+        self._animated = False
+
+    def tear_down(self):
+        super().tear_down()
+        self._end_slide()
+        if self.profiler is not None:
+            logger.info(f"Render profile written to {self.profiler.write(type(self).__name__)}")
+
+    def render(self, *args, **kwargs):
+        super().render(*args, **kwargs)
+        # Slides are numbered as saved by manim-slides, i.e. after dropping
+        # the animations skipped by a preview
+        offset = config.from_animation_number or 0
+        write_stills(str(self), [
+            i for i, slide in enumerate(self._slides) if slide.end_animation + offset in self.still_slides
+        ])
+
+    def chapter(self, title):
+        if not self.preview:
+            return
+        first, last = self.preview
+        index = CHAPTER_TITLES.index(title)
+        if index > last:
+            raise EndSceneEarlyException()
+        if index >= first and config.from_animation_number > self.renderer.num_plays:
+            # manim-slides drops the skipped animations from the slides as well
+            config.from_animation_number = self.renderer.num_plays
+
+    def resume_from(self, txt):
+        # Recreate the end state of the previous section for a standalone render
+        title = create_title(txt)
+        self.add(title, create_logo())
+        return title
+
+    def end_section(self):
+        # Trailing animations of a section become their own slide; advance
+        # automatically so the split deck plays exactly like the single scene.
+        self.next_slide(auto_next=True)
+
+    def title_and_agenda(self):
 
         ########################################
         #         Slide 1: Title Slide
+        self.chapter("Title Slide")
 
         # Display the company logo
-        logo = ImageMobject("img/company_logo.png")
-        logo.scale(0.3)
-        logo.to_corner(DR)
+        logo = create_logo()
 
         slide_1_title = create_title('Understanding Merkle Trees')
-        author = Text(
+        author = cached_text(
             "Gianlorenzo & Raphael - Renuo Learning Week 2024",
             font_size=25
         ).to_edge(DOWN)
@@ -36,7 +184,7 @@ class MerkleTreePresentation(Slide):
         self.next_slide()
 
         # Display the subtitle
-        subtitle = Text(
+        subtitle = cached_text(
             "Ensuring Data Integrity and History",
             color=WHITE,
             font_size=28
@@ -50,6 +198,7 @@ class MerkleTreePresentation(Slide):
 
         ########################################
         #         Slide 2: Agenda
+        self.chapter("Agenda")
 
         # Transform the previous title into the new title
         slide_2_title = create_title(
@@ -70,7 +219,7 @@ class MerkleTreePresentation(Slide):
         # Create Text objects for each item
         agenda_texts = VGroup(
             *[
-                Text(
+                cached_text(
                     item,
                     color=WHITE,
 
@@ -94,6 +243,7 @@ class MerkleTreePresentation(Slide):
 
         ########################################
         #         Slide 3: The Problem Merkle Trees Solve
+        self.chapter("The Problem")
 
         # Transform the title
         slide_3_title = create_title("The Problem")
@@ -101,7 +251,7 @@ class MerkleTreePresentation(Slide):
         self.next_slide()
 
         # Main Point
-        main_point = Text(
+        main_point = cached_text(
             "\"Ensuring data integrity and tracking history\nin distributed systems.\"",
             color=WHITE,
             font_size=48,
@@ -112,7 +262,7 @@ class MerkleTreePresentation(Slide):
         self.next_slide()
 
         # Question to Audience
-        question = Text(
+        question = cached_text(
             "How would you verify that every part of a dataset\nis intact and untampered?",
             color=YELLOW,
             font_size=34,
@@ -124,9 +274,13 @@ class MerkleTreePresentation(Slide):
 
         # Prepare for the next slide
         self.play(FadeOut(main_point), FadeOut(question))
+        self.end_section()
+        return slide_3_title
 
+    def hash_functions(self, slide_3_title):
         ########################################
         #         Slide 4/5: Introduction to Hash Functions and visualization
+        self.chapter("Introduction to Hash Functions")
 
         # Transform the title
         slide_4_title = create_title("Introduction to Hash Functions")
@@ -134,13 +288,13 @@ class MerkleTreePresentation(Slide):
         self.next_slide()
 
         # Question to the audience
-        question = Text("Can someone explain what a hash function is?")
+        question = cached_text("Can someone explain what a hash function is?")
         question.next_to(slide_4_title, DOWN, buff=1)
         self.play(Write(question))
         self.next_slide()
 
         # Display the definition
-        definition = Text(
+        definition = cached_text(
             "A function that converts input data into a fixed-size string of bytes.",
             font_size=36,
             color=YELLOW
@@ -161,10 +315,10 @@ class MerkleTreePresentation(Slide):
 
         # List of properties
         properties = VGroup(
-            Text("1. Deterministic"),
-            Text("2. Pre-image Resistance"),
-            Text("3. Collision Resistance"),
-            Text("4. Fast Computation"),
+            cached_text("1. Deterministic"),
+            cached_text("2. Pre-image Resistance"),
+            cached_text("3. Collision Resistance"),
+            cached_text("4. Fast Computation"),
         ).arrange(DOWN, aligned_edge=LEFT)
         properties.next_to(slide_4_title, DOWN, buff=1)
         self.play(Write(properties))
@@ -177,18 +331,18 @@ class MerkleTreePresentation(Slide):
         self.next_slide()
 
         # Show that same input always produces same output
-        input_text1 = Text("Input: 'Hello'")
+        input_text1 = cached_text("Input: 'Hello'")
         input_text1.shift(LEFT * 3 + UP)
-        hash_text1 = Text("Hash: 185F8DB3...", font_size=24)
+        hash_text1 = cached_text(f"Hash: {short_hash(hash_leaf(b'Hello'))}...", font_size=24)
         hash_text1.next_to(input_text1, DOWN)
         self.play(Write(input_text1))
         self.play(Write(hash_text1))
         self.next_slide()
 
         # Show that input 'Hello' again produces same hash
-        input_text2 = Text("Input: 'Hello'")
+        input_text2 = cached_text("Input: 'Hello'")
         input_text2.shift(RIGHT * 3 + UP)
-        hash_text2 = Text("Hash: 185F8DB3...", font_size=24)
+        hash_text2 = cached_text(f"Hash: {short_hash(hash_leaf(b'Hello'))}...", font_size=24)
         hash_text2.next_to(input_text2, DOWN)
         self.play(Write(input_text2))
         self.play(Write(hash_text2))
@@ -209,8 +363,8 @@ class MerkleTreePresentation(Slide):
         self.next_slide()
 
         # Show given a hash, it's hard to find original input
-        given_hash = Text("Given Hash: A9993E36...", font_size=24)
-        find_input = Text("Can you find the Input?", color=RED)
+        given_hash = cached_text(f"Given Hash: {short_hash(hash_leaf(b'abc'))}...", font_size=24)
+        find_input = cached_text("Can you find the Input?", color=RED)
         VGroup(given_hash, find_input).arrange(DOWN, buff=0.5).next_to(slide_4_title, DOWN, buff=1)
         self.play(Write(given_hash))
         self.play(Write(find_input))
@@ -229,18 +383,16 @@ class MerkleTreePresentation(Slide):
 
         # Create multiple inputs and their hashes
         inputs = [
-            Text("Input: 'Data1'", font_size=28),
-            Text("Input: 'Data2'", font_size=28),
-            Text("Input: 'Data3'", font_size=28),
-            Text("Input: 'Data4'", font_size=28),
+            cached_text("Input: 'Data1'", font_size=28),
+            cached_text("Input: 'Data2'", font_size=28),
+            cached_text("Input: 'Data3'", font_size=28),
+            cached_text("Input: 'Data4'", font_size=28),
         ]
 
-        # Simulated unique hashes for each input
+        # Unique hashes for each input
         hashes = [
-            Text("Hash: 5D41402A...", font_size=24, color=ORANGE),
-            Text("Hash: 7D793037...", font_size=24, color=ORANGE),
-            Text("Hash: 2E997585...", font_size=24, color=ORANGE),
-            Text("Hash: 8F14E45F...", font_size=24, color=ORANGE),
+            cached_text(f"Hash: {short_hash(hash_leaf(f'Data{i + 1}'.encode()))}...", font_size=24, color=ORANGE)
+            for i in range(4)
         ]
         arrows = []
 
@@ -262,7 +414,7 @@ class MerkleTreePresentation(Slide):
         self.next_slide()
 
         # Display a message about collision resistance
-        message = Text(
+        message = cached_text(
             "Finding two inputs with the same hash is extremely hard!",
             font_size=28,
             color=RED
@@ -287,9 +439,9 @@ class MerkleTreePresentation(Slide):
         self.next_slide()
 
         # Simulate fast computation
-        input_large = Text("Input: Large File")
-        processing = Text("Processing...", font_size=24)
-        hash_large = Text("Hash Computed Instantly!", font_size=24)
+        input_large = cached_text("Input: Large File")
+        processing = cached_text("Processing...", font_size=24)
+        hash_large = cached_text("Hash Computed Instantly!", font_size=24)
         VGroup(input_large, processing, hash_large).arrange(DOWN, buff=0.5).next_to(slide_4_title, DOWN, buff=1)
         self.play(Write(input_large))
         self.play(Write(processing))
@@ -306,8 +458,8 @@ class MerkleTreePresentation(Slide):
         self.next_slide()
 
         # Visualize data and its 'fingerprint'
-        data = Text("Data")
-        fingerprint = Text("Unique Fingerprint (Hash)", color=YELLOW)
+        data = cached_text("Data")
+        fingerprint = cached_text("Unique Fingerprint (Hash)", color=YELLOW)
         arrow = Arrow(start=data.get_bottom(), end=fingerprint.get_top(), buff=0.1)
         VGroup(data, arrow, fingerprint).arrange(DOWN, buff=0.5).next_to(slide_4_title, DOWN, buff=1)
         self.play(Write(data))
@@ -318,9 +470,12 @@ class MerkleTreePresentation(Slide):
         # Clean up
         self.play(FadeOut(data), FadeOut(arrow), FadeOut(fingerprint))
         self.next_slide()
+        return slide_4_title
 
+    def building_blocks(self, slide_4_title):
         ########################################
         #         Slide 6: Building Blocks of Merkle Trees
+        self.chapter("Building Blocks of Merkle Trees")
 
         # Transform the title
         slide_6_title = create_title("Building Blocks of Merkle Trees")
@@ -342,7 +497,7 @@ class MerkleTreePresentation(Slide):
             rect = Square(side_length=1.0)
             rect.shift(DOWN * 2 + RIGHT * x_pos)
             # Add label to the rectangle
-            text = Text(label).scale(0.6)
+            text = cached_text(label).scale(0.6)
             text.move_to(rect.get_center())
             # Add to groups
             leaf_nodes.add(rect)
@@ -361,7 +516,7 @@ class MerkleTreePresentation(Slide):
             # Transform the data block into a hash node with an orange border
             hash_rect = Square(side_length=1.0, color=ORANGE)
             hash_rect.move_to(leaf_nodes[i].get_center())
-            hash_label = Text(f"h{i + 1}").scale(0.6)
+            hash_label = cached_text(f"h{i + 1}").scale(0.6)
             hash_label.move_to(hash_rect.get_center())
 
             # Add to groups
@@ -434,7 +589,7 @@ class MerkleTreePresentation(Slide):
             # Transform the data block into a hash node with an orange border
             hash_rect = Square(side_length=1.0, color=ORANGE)
             hash_rect.move_to(parent_hash_nodes[i].get_center())
-            hash_label = Text(f"h{i * 2 + 1}{i * 2 + 2}").scale(0.6)
+            hash_label = cached_text(f"h{i * 2 + 1}{i * 2 + 2}").scale(0.6)
             hash_label.move_to(hash_rect.get_center())
 
             # Add to groups
@@ -490,7 +645,7 @@ class MerkleTreePresentation(Slide):
         # Transform the data block into a hash node with an orange border
         root_hash_node = Square(side_length=1.5, color=ORANGE)
         root_hash_node.shift(UP * 3 + DOWN)
-        root_hash_text = Text("h1234").scale(0.7)
+        root_hash_text = cached_text("h1234").scale(0.7)
         root_hash_text.move_to(root_node.get_center())
 
         # Add to groups
@@ -508,6 +663,7 @@ class MerkleTreePresentation(Slide):
 
         ########################################
         #         Slide 7: What is a Merkle Tree?
+        self.chapter("What is a Merkle Tree?")
 
         # Transform the title
         slide_7_title = create_title("What is a Merkle Tree? ")
@@ -520,7 +676,7 @@ class MerkleTreePresentation(Slide):
             "1. Every leaf node is a hash of data",
             "2. Every non-leaf node is a hash of its children"
         ]
-        definition = VGroup(*[Text(line, font_size=30) for line in definition_lines]).arrange(DOWN, aligned_edge=LEFT,
+        definition = VGroup(*[cached_text(line, font_size=30) for line in definition_lines]).arrange(DOWN, aligned_edge=LEFT,
                                                                                               buff=0.3)
         definition.next_to(slide_7_title, DOWN, buff=0.5)
         self.play(Write(definition))
@@ -537,7 +693,7 @@ class MerkleTreePresentation(Slide):
         for i, (label, x_pos) in enumerate(zip(leaf_labels, x_positions)):
             rect = Square(side_length=1.0, color=ORANGE)
             rect.shift(DOWN * 2 + RIGHT * x_pos)
-            text = Text(f"h{label}").scale(0.6)
+            text = cached_text(f"h{label}").scale(0.6)
             text.move_to(rect.get_center())
             leaf_nodes.add(rect)
             leaf_texts.add(text)
@@ -555,7 +711,7 @@ class MerkleTreePresentation(Slide):
         for i in range(2):
             rect = Square(side_length=1.2, color=ORANGE)
             rect.shift(UP * 0.5 + DOWN + RIGHT * parent_positions[i])
-            text = Text(f"h{i * 2 + 1}{i * 2 + 2}").scale(0.6)
+            text = cached_text(f"h{i * 2 + 1}{i * 2 + 2}").scale(0.6)
             text.move_to(rect.get_center())
             parent_nodes.add(rect)
             parent_texts.add(text)
@@ -582,7 +738,7 @@ class MerkleTreePresentation(Slide):
 
         # Step 3: Display the root node (hD1D2D3D4)
         root_node = Square(side_length=1.5, color=ORANGE)
-        root_text = Text("h1234").scale(0.6)
+        root_text = cached_text("h1234").scale(0.6)
         root_text.move_to(root_node.get_center())
 
         left_arrow = Arrow(start=parent_nodes[0].get_top() + UP * 0.2,
@@ -601,7 +757,7 @@ class MerkleTreePresentation(Slide):
         self.next_slide()
 
         # Emphasize the root hash as the summary of all data
-        emphasize_text = Text("The Root Hash summarizes all data in the tree", font_size=28, color=YELLOW)
+        emphasize_text = cached_text("The Root Hash summarizes all data in the tree", font_size=28, color=YELLOW)
         emphasize_text.next_to(root_node, UP, buff=1)
         slide_7_tiles.append(emphasize_text)
         arrow_to_root = Arrow(start=emphasize_text.get_bottom(), end=root_node.get_top(), buff=0.2, color=YELLOW)
@@ -611,9 +767,12 @@ class MerkleTreePresentation(Slide):
         self.play(FadeOut(*slide_7_tiles))
 
         self.next_slide()
+        return slide_7_title
 
+    def how_it_works(self, slide_7_title):
         ########################################
         #         Slide 8: How Merkle Trees Work
+        self.chapter("How Merkle Trees Work")
 
         # Transform the title
         slide_8_title = create_title("How Merkle Trees Work")
@@ -631,7 +790,7 @@ class MerkleTreePresentation(Slide):
         for i, (label, x_pos) in enumerate(zip(leaf_labels, x_positions)):
             rect = Square(side_length=1.0, color=ORANGE)
             rect.shift(DOWN * 2.3 + RIGHT * x_pos)
-            text = Text(label).scale(0.6)
+            text = cached_text(label).scale(0.6)
             text.move_to(rect.get_center())
             leaf_nodes.add(rect)
             leaf_texts.add(text)
@@ -645,7 +804,7 @@ class MerkleTreePresentation(Slide):
         for i in range(2):
             rect = Square(side_length=1.0, color=ORANGE)
             rect.shift(UP * 0.5 + DOWN + RIGHT * parent_positions[i])
-            text = Text(f"h{i * 2 + 1}{i * 2 + 2}").scale(0.6)
+            text = cached_text(f"h{i * 2 + 1}{i * 2 + 2}").scale(0.6)
             text.move_to(rect.get_center())
             parent_nodes.add(rect)
             parent_texts.add(text)
@@ -654,7 +813,7 @@ class MerkleTreePresentation(Slide):
 
         root_node = Square(side_length=1.2, color=ORANGE)
         root_node.shift(UP * 2.3 + DOWN)
-        root_text = Text("h1234").scale(0.6)
+        root_text = cached_text("h1234").scale(0.6)
         root_text.move_to(root_node.get_center())
         slide_8_tiles.append(root_node)
         slide_8_tiles.append(root_text)
@@ -684,67 +843,71 @@ class MerkleTreePresentation(Slide):
         self.next_slide()
 
         # Highlight how altering any data changes the root hash
-        altered_data_text = Text("What if h1 changes?", font_size=25)
+        altered_data_text = cached_text("What if h1 changes?", font_size=25)
         altered_data_text.to_edge(DOWN)
         self.play(Write(altered_data_text))
         self.next_slide()
 
-        altered_leaf_text = Text("h1").scale(0.6).move_to(leaf_texts[0].get_center())
+        altered_leaf_text = cached_text("h1").scale(0.6).move_to(leaf_texts[0].get_center())
         self.play(Transform(leaf_texts[0], altered_leaf_text), leaf_nodes[0].animate.set_color(BLUE))
         self.next_slide()
 
         # Show that the root hash changes
-        altered_parent_text = Text("h12").scale(0.5).move_to(parent_texts[0].get_center())
-        altered_root_text = Text("h1234").scale(0.5).move_to(root_text.get_center())
+        altered_parent_text = cached_text("h12").scale(0.5).move_to(parent_texts[0].get_center())
+        altered_root_text = cached_text("h1234").scale(0.5).move_to(root_text.get_center())
         self.play(Transform(parent_texts[0], altered_parent_text), parent_nodes[0].animate.set_color(BLUE))
         self.next_slide()
         self.play(Transform(root_text, altered_root_text), root_node.animate.set_color(BLUE))
         self.next_slide()
 
         # Show efficiency in verifying data integrity
-        efficiency_text = Text("Merkle Trees efficiently verify data integrity", font_size=28, color=YELLOW)
+        efficiency_text = cached_text("Merkle Trees efficiently verify data integrity", font_size=28, color=YELLOW)
         efficiency_text.next_to(slide_8_title, DOWN, buff=0.5)
         self.play(Write(efficiency_text))
         self.next_slide()
         self.play(FadeOut(efficiency_text), FadeOut(*slide_8_tiles), FadeOut(altered_data_text))
+        self.end_section()
+        return slide_8_title
 
+    def bittorrent(self, slide_8_title):
         ########################################
         #         Slide 9: Example Usage - BitTorrent
+        self.chapter("Example Usage - BitTorrent")
 
         # Transform the title
         slide_9_title = create_title("Example Usage - BitTorrent")
         self.play(Transform(slide_8_title, slide_9_title, replace_mobject_with_target_in_scene=True))
         self.next_slide()
 
-        label_1 = Text("1. Retrieve file metadata", font_size=25).to_edge(DOWN)
+        label_1 = cached_text("1. Retrieve file metadata", font_size=25).to_edge(DOWN)
         self.play(Write(label_1))
 
         # Animation 1: Large File with a Hash
         file_box = Square().scale(1.5).set_fill(BLUE, opacity=0.5)
-        file_label = Text("File.mkv 30GB").next_to(file_box, UP)
-        file_hash_text = Text("Merkle Root:", color=BLUE).next_to(file_box, DOWN + LEFT)
-        file_hash_hash = Text("f2f5f5426").next_to(file_hash_text, RIGHT, buff=0.2)
+        file_label = cached_text("File.mkv 30GB").next_to(file_box, UP)
+        file_hash_text = cached_text("Merkle Root:", color=BLUE).next_to(file_box, DOWN + LEFT)
+        file_hash_hash = cached_text(TORRENT_TREE.hexroot[:9]).next_to(file_hash_text, RIGHT, buff=0.2)
         file_hash = VGroup(file_hash_text, file_hash_hash)
         self.play(Create(file_box), Write(file_label), Write(file_hash))
         self.next_slide()
 
-        label_2 = Text("2. Get chunks from seeds", font_size=25).to_edge(DOWN)
+        label_2 = cached_text("2. Get chunks from seeds", font_size=25).to_edge(DOWN)
         self.play(ReplacementTransform(label_1, label_2))
         self.next_slide()
 
         chunks = VGroup(*[Square().scale(0.5).set_fill(BLUE, opacity=0.5) for _ in range(4)])
         chunks.arrange_in_grid(rows=1, buff=0.5).next_to(slide_9_title, DOWN, buff=2)
 
-        chunk_labels = VGroup(*[Text(f"C{i + 1}").next_to(chunks[i], DOWN) for i in range(4)])
+        chunk_labels = VGroup(*[cached_text(f"C{i + 1}").next_to(chunks[i], DOWN) for i in range(4)])
 
         self.play(ReplacementTransform(file_box, chunks), Write(chunk_labels), FadeOut(file_label), FadeOut(file_hash))
         self.next_slide()
 
-        label_3 = Text("3. Download Chunks", font_size=25).to_edge(DOWN)
+        label_3 = cached_text("3. Download Chunks", font_size=25).to_edge(DOWN)
         self.play(ReplacementTransform(label_2, label_3))
         self.next_slide()
 
-        chunk_hashes = VGroup(*[Text(f"H{i + 1}").next_to(chunks[i], DOWN).set_color(ORANGE) for i in range(4)])
+        chunk_hashes = VGroup(*[cached_text(f"H{i + 1}").next_to(chunks[i], DOWN).set_color(ORANGE) for i in range(4)])
 
         for i in [3, 0, 2, 1]:
             self.play(chunks[i].animate.set_fill(GREEN, opacity=0.7), run_time=1)
@@ -752,7 +915,7 @@ class MerkleTreePresentation(Slide):
 
         self.next_slide()
 
-        label_4 = Text("4. Compute Merkle Tree", font_size=25).to_edge(DOWN)
+        label_4 = cached_text("4. Compute Merkle Tree", font_size=25).to_edge(DOWN)
         self.play(ReplacementTransform(label_3, label_4))
         self.next_slide()
 
@@ -762,27 +925,27 @@ class MerkleTreePresentation(Slide):
 
         self.next_slide()
 
-        merkle_root_text = Text("H1234:", color=ORANGE).move_to(ORIGIN + LEFT)
+        merkle_root_text = cached_text("H1234:", color=ORANGE).move_to(ORIGIN + LEFT)
         self.play(ReplacementTransform(chunks, merkle_root_text), FadeOut(chunk_hashes))
         self.next_slide()
 
-        merkle_root_hash = Text("f2f5f5426").next_to(merkle_root_text, RIGHT)
+        merkle_root_hash = cached_text(TORRENT_TREE.hexroot[:9]).next_to(merkle_root_text, RIGHT)
         merkle_root_group = VGroup(merkle_root_text, merkle_root_hash)
         self.play(Write(merkle_root_hash))
         self.next_slide()
 
-        label_5 = Text("5. Compare Root Hash", font_size=25).to_edge(DOWN)
+        label_5 = cached_text("5. Compare Root Hash", font_size=25).to_edge(DOWN)
         self.play(ReplacementTransform(label_4, label_5))
         self.next_slide()
 
-        file_text = Text("File Merkle Root:", color=BLUE).next_to(merkle_root_text, DOWN)
-        file_hash = Text("f2f5f5426").next_to(file_text, RIGHT)
+        file_text = cached_text("File Merkle Root:", color=BLUE).next_to(merkle_root_text, DOWN)
+        file_hash = cached_text(TORRENT_TREE.hexroot[:9]).next_to(file_text, RIGHT)
         file_text_group = VGroup(file_text, file_hash)
 
         self.play(Write(file_text_group))
         self.next_slide()
 
-        label_6 = Text("File Integrity Verified!", color=GREEN).to_edge(DOWN)
+        label_6 = cached_text("File Integrity Verified!", color=GREEN).to_edge(DOWN)
         self.play(Indicate(file_hash, scale_factor=1.2, color=GREEN),
                   Indicate(merkle_root_hash, scale_factor=1.2, color=GREEN))
         self.play(ReplacementTransform(label_5, label_6))
@@ -790,7 +953,10 @@ class MerkleTreePresentation(Slide):
 
         # Clear the scene
         self.play(FadeOut(VGroup(merkle_root_group, file_text_group, label_6)))
+        self.end_section()
+        return slide_9_title
 
+    def bitcoin(self, slide_9_title):
         # ########################################
         # #         Slide 10: Example Usage - Git
         #
@@ -801,6 +967,7 @@ class MerkleTreePresentation(Slide):
 
         ########################################
         #         Slide 11: Example Usage - BitCoin
+        self.chapter("Example Usage - Bitcoin")
 
         # Transform the title
         slide_11_title = create_title("Example Usage - Bitcoin")
@@ -809,46 +976,51 @@ class MerkleTreePresentation(Slide):
 
         # Create a block representing a container labeled "Bitcoin Block"
         bitcoin_block = Rectangle(width=6, height=4).set_fill(BLUE, opacity=0.3)
-        block_label = Text("Bitcoin Block", font_size=24).next_to(bitcoin_block, UP)
+        block_label = cached_text("Bitcoin Block", font_size=24).next_to(bitcoin_block, UP)
         self.play(Create(bitcoin_block), Write(block_label))
         self.next_slide()
 
         # Create a matrix of transactions inside the block
-        transactions = VGroup(*[Text(f"Tx {i + 1}", font_size=20) for i in range(16)])
+        transactions = VGroup(*[cached_text(f"Tx {i + 1}", font_size=20) for i in range(16)])
         transactions.arrange_in_grid(rows=4, buff=0.7).move_to(bitcoin_block.get_center())
         self.play(ShowIncreasingSubsets(transactions), run_time=4)
         self.next_slide()
 
         transaction_hashes = VGroup()
         for i in range(16):
-            tx_hash = hashlib.sha256(f"Tx {i + 1}".encode()).hexdigest()[:5]
-            hash_text = Text(f"{tx_hash}..", font_size=20, color=ORANGE)
+            tx_hash = BLOCK_TXIDS[i][:5]
+            hash_text = cached_text(f"{tx_hash}..", font_size=20, color=ORANGE)
             transaction_hashes.add(hash_text)
         transaction_hashes.arrange_in_grid(rows=4, buff=0.7).move_to(bitcoin_block.get_center())
         self.play(ReplacementTransform(transactions, transaction_hashes))
         self.next_slide()
 
-        combined_hash_input = ''.join([hashlib.sha256(f"Tx {i + 1}".encode()).hexdigest() for i in range(16)])
-        merkle_root_hash = hashlib.sha256(combined_hash_input.encode()).hexdigest()[:15]
-        merkle_root = Text(f"Root Hash: {merkle_root_hash}...", font_size=25, color=ORANGE).move_to(
+        merkle_root_hash = digest_to_hex(BLOCK_TREE.root)[:15]
+        merkle_root = cached_text(f"Root Hash: {merkle_root_hash}...", font_size=25, color=ORANGE).move_to(
             bitcoin_block.get_center())
         self.play(ReplacementTransform(transaction_hashes, merkle_root))
         self.next_slide()
 
         # Add text explaining the Merkle root
-        explanation_1 = Text("Merkle root summarizes all the transactions in a block", font_size=25).to_edge(DOWN)
+        explanation_1 = cached_text("Merkle root summarizes all the transactions in a block", font_size=25).to_edge(DOWN)
         self.play(Write(explanation_1))
         self.next_slide()
 
         # Add basic information below the block after explanation
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        prev_block_hash = hashlib.sha256("Previous Block".encode()).hexdigest()[:15] + "..."
-        prev_block_time = Text(f"Timestamp: {timestamp}", font_size=25).next_to(merkle_root, DOWN, buff=0.3)
+        # Linked headers for the shown block and the one before it
+        now = render_clock()
+        _, prev_header, header = build_chain(
+            [PREV_BLOCK_TXIDS[:8], PREV_BLOCK_TXIDS, BLOCK_TXIDS],
+            start_time=int((now - datetime.timedelta(minutes=20)).replace(tzinfo=datetime.timezone.utc).timestamp()),
+        )
+        timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
+        prev_block_hash = digest_to_hex(header.prev_hash)[:15] + "..."
+        prev_block_time = cached_text(f"Timestamp: {timestamp}", font_size=25).next_to(merkle_root, DOWN, buff=0.3)
         block_info = VGroup(prev_block_time, merkle_root)
 
-        explanation_2_1 = Text("Blocks contain other important information like timestamp", font_size=25).to_edge(
+        explanation_2_1 = cached_text("Blocks contain other important information like timestamp", font_size=25).to_edge(
             DOWN + LEFT * 3)
-        explanation_2_2 = Text("and the previous hash", font_size=25).next_to(explanation_2_1, RIGHT, buff=0.1)
+        explanation_2_2 = cached_text("and the previous hash", font_size=25).next_to(explanation_2_1, RIGHT, buff=0.1)
         explanation_2 = VGroup(explanation_2_1, explanation_2_2)
 
         self.play(ReplacementTransform(explanation_1, explanation_2_1))
@@ -862,24 +1034,26 @@ class MerkleTreePresentation(Slide):
         self.wait(0.5)
 
         left_block = Rectangle(width=6, height=4).set_fill(BLUE, opacity=0.3).move_to(LEFT * 4)
-        left_block_label = Text("Previous Block", font_size=24).next_to(left_block, UP)
+        left_block_label = cached_text("Previous Block", font_size=24).next_to(left_block, UP)
         self.play(Create(left_block), Write(left_block_label))
         self.wait(0.5)
 
         # Add the previous hash to the new block
-        prev_timestamp = (datetime.datetime.now() - datetime.timedelta(minutes=10)).strftime("%Y-%m-%d %H:%M:%S")
-        prev_prev_block_hash = hashlib.sha256("Prev Block".encode()).hexdigest()[:15] + "..."
+        prev_timestamp = (now - datetime.timedelta(minutes=10)).strftime("%Y-%m-%d %H:%M:%S")
+        prev_prev_block_hash = digest_to_hex(prev_header.prev_hash)[:15] + "..."
+        prev_merkle_root_hash = digest_to_hex(prev_header.merkle_root)[:15]
         prev_block_info = VGroup(
-            Text(f"Root Hash: {prev_block_hash}", font_size=25, color=ORANGE).move_to(left_block.get_center()),
-            Text(f"Timestamp: {prev_timestamp}", font_size=25).next_to(left_block.get_center(), DOWN, buff=0.3),
+            cached_text(f"Root Hash: {prev_merkle_root_hash}...", font_size=25, color=ORANGE).move_to(
+                left_block.get_center()),
+            cached_text(f"Timestamp: {prev_timestamp}", font_size=25).next_to(left_block.get_center(), DOWN, buff=0.3),
         )
         self.play(Write(prev_block_info))
         self.next_slide()
 
         # Link the blocks as a chain
-        prev_prev_block_hash = Text(f"Previous Block: {prev_prev_block_hash}", font_size=25).next_to(
+        prev_prev_block_hash = cached_text(f"Previous Block: {prev_prev_block_hash}", font_size=25).next_to(
             left_block.get_center(), DOWN, buff=0.9)
-        prev_block_hash = Text(f"Previous Block: {prev_block_hash}", font_size=25).next_to(merkle_root, DOWN,
+        prev_block_hash = cached_text(f"Previous Block: {prev_block_hash}", font_size=25).next_to(merkle_root, DOWN,
                                                                                                 buff=0.9)
         chain_link = Line(start=left_block.get_right(), end=bitcoin_block.get_left(), stroke_width=6, color=WHITE)
         self.play(Write(explanation_2_2))
@@ -904,14 +1078,17 @@ class MerkleTreePresentation(Slide):
         ))
         self.next_slide()
 
+        # Simplified Payment Verification: proving a transaction to a light client
+        self.chapter("Bitcoin SPV")
+
         user_device = ImageMobject("img/bitcoin_user.png").scale(0.5).to_corner(LEFT)
         self.play(FadeIn(user_device))
 
-        user_text = Text("User Verifying \n a Transaction", font_size=24).next_to(user_device, DOWN)
+        user_text = cached_text("User Verifying \n a Transaction", font_size=24).next_to(user_device, DOWN)
         self.play(Write(user_text))
 
         # Add Question Mark Next to User
-        question_mark = Text("?", font_size=36, color=YELLOW).next_to(user_device, UP, buff=0.1)
+        question_mark = cached_text("?", font_size=36, color=YELLOW).next_to(user_device, UP, buff=0.1)
         self.play(Write(question_mark))
 
         self.next_slide()
@@ -919,30 +1096,18 @@ class MerkleTreePresentation(Slide):
         # Bitcoin Image at the Center
         bitcoin_image = ImageMobject("img/bitcoin.png").scale(0.2).move_to(RIGHT * 3)
 
-        # Network Representation: Nodes Around Bitcoin Image
-        network_nodes = VGroup()
-        angles = np.linspace(0, 2 * PI, 25, endpoint=False)
-        radius = 2
-
-        # Create Nodes Around Bitcoin Image
-        for angle in angles:
-            node = Dot(radius=0.1).set_color(BLUE).set_z_index(10)
-            node.move_to(bitcoin_image.get_center() + radius * np.array([np.cos(angle), np.sin(angle), 0]))
-            network_nodes.add(node)
-
-        # Connect Nodes to Form a Network Graph
-        network_lines = VGroup()
-        for i, node in enumerate(network_nodes):
-            next_node = network_nodes[(i + 1) % len(network_nodes)]
-            line = Line(node.get_center(), next_node.get_center()).set_z_index(-1)
-            network_lines.add(line)
-
-        # Randomly connect nodes to form a network
-        for i in range(35):
-            node1 = random.choice(network_nodes)
-            node2 = random.choice(network_nodes)
-            line = Line(node1.get_center(), node2.get_center()).set_z_index(-1)
-            network_lines.add(line)
+        # Network Representation: Nodes Around Bitcoin Image, connected in a
+        # ring and by random links
+        network = NetworkGraph.ring(
+            25,
+            radius=2,
+            extra_edges=35,
+            center=bitcoin_image.get_center(),
+            seed=self.rng.randrange(2 ** 32),
+            node_color=BLUE,
+        )
+        network_nodes = network.nodes.set_z_index(10)
+        network_lines = network.edges.set_z_index(-1)
 
         self.play(Create(network_nodes), Create(network_lines))
         self.play(FadeIn(bitcoin_image))
@@ -950,7 +1115,7 @@ class MerkleTreePresentation(Slide):
         self.next_slide()
 
         # Explanation Line
-        explanation_1 = Text(
+        explanation_1 = cached_text(
             "The user connects to the Bitcoin network to verify a specific transaction",
             font_size=25
         ).to_edge(DOWN)
@@ -958,12 +1123,12 @@ class MerkleTreePresentation(Slide):
         self.next_slide()
 
         # Merkle Path to Root
-        network_node = network_nodes[-10]
+        network_node = network.node_dot(-10).set_z_index(10)
         path_line = DashedLine(user_device.get_right() + RIGHT * 0.5, network_node.get_center())
         self.play(network_node.animate.set_color(ORANGE), Create(path_line))
         self.next_slide()
 
-        explanation_2 = Text(
+        explanation_2 = cached_text(
             "The user requests a Merkle Proof from the network.",
             font_size=25
         ).to_edge(DOWN)
@@ -972,13 +1137,13 @@ class MerkleTreePresentation(Slide):
         self.next_slide()
 
         line = Line(path_line.get_start() + UP * 0.2, path_line.get_end() + UP * 0.2).set_opacity(0)
-        transaction_hash = Text("TXN: 8a9f12...", font_size=18, color=BLUE).move_to(line.get_start())
+        transaction_hash = cached_text(f"TXN: {BLOCK_TXIDS[0][:6]}...", font_size=18, color=BLUE).move_to(line.get_start())
         self.play(FadeIn(transaction_hash))
         self.play(MoveAlongPath(transaction_hash, line), run_time=2)
         self.play(FadeOut(transaction_hash))
 
         self.next_slide()
-        explanation_3 = Text(
+        explanation_3 = cached_text(
             "The node computes the Merkle Proof",
             font_size=25
         ).to_edge(DOWN)
@@ -997,7 +1162,7 @@ class MerkleTreePresentation(Slide):
         for i, (label, x_pos) in enumerate(zip(leaf_labels, x_positions)):
             rect = Square(side_length=1.0, color=ORANGE)
             rect.shift(DOWN * 2.3 + RIGHT * x_pos)
-            text = Text(label).scale(0.6)
+            text = cached_text(label).scale(0.6)
             text.move_to(rect.get_center())
             leaf_nodes.add(rect)
             leaf_texts.add(text)
@@ -1011,7 +1176,7 @@ class MerkleTreePresentation(Slide):
         for i in range(2):
             rect = Square(side_length=1.0, color=ORANGE)
             rect.shift(UP * 0.5 + DOWN + RIGHT * parent_positions[i])
-            text = Text(f"h{i * 2 + 1}{i * 2 + 2}").scale(0.6)
+            text = cached_text(f"h{i * 2 + 1}{i * 2 + 2}").scale(0.6)
             text.move_to(rect.get_center())
             parent_nodes.add(rect)
             parent_texts.add(text)
@@ -1019,7 +1184,7 @@ class MerkleTreePresentation(Slide):
 
         root_node = Square(side_length=1.2, color=ORANGE)
         root_node.shift(UP * 2.3 + DOWN)
-        root_text = Text("h1234").scale(0.6)
+        root_text = cached_text("h1234").scale(0.6)
         root_text.move_to(root_node.get_center())
         root_block = VGroup(root_node, root_text)
 
@@ -1043,7 +1208,7 @@ class MerkleTreePresentation(Slide):
                   FadeIn(root_text), FadeIn(arrows))
         self.next_slide()
 
-        explanation_4 = Text(
+        explanation_4 = cached_text(
             "This proof is a sequence of hashes needed to reconstruct the path \n from the transaction hash to the Merkle root.",
             font_size=25
         ).to_edge(DOWN)
@@ -1052,7 +1217,7 @@ class MerkleTreePresentation(Slide):
 
         self.play(Indicate(leaf_nodes[0], scale_factor=1.5))
         self.next_slide()
-        explanation_5 = Text(
+        explanation_5 = cached_text(
             "The transaction hash itself is not included in the proof.",
             font_size=25
         ).to_edge(DOWN)
@@ -1060,7 +1225,7 @@ class MerkleTreePresentation(Slide):
 
         self.play(leaf_nodes[0].animate.set_color(YELLOW))
         self.next_slide()
-        explanation_6 = Text(
+        explanation_6 = cached_text(
             "Are included only the hashes of the sibling nodes along the path to the Merkle root.",
             font_size=25
         ).to_edge(DOWN)
@@ -1077,16 +1242,16 @@ class MerkleTreePresentation(Slide):
         self.next_slide()
 
         merkle_proof_bullet = Dot(radius=0.1, color=BLUE).move_to(line.get_end())
-        text = Text(
+        text = cached_text(
             "The Merkle proof provides just enough information for you to \n compute the Merkle root starting from your transaction hash.",
             font_size=30, color=YELLOW).to_edge(LEFT)
         self.play(ReplacementTransform(merkle_proof, merkle_proof_bullet), Write(text))
         self.next_slide()
 
         reversed_line = Line(line.get_end(), line.get_start()).set_opacity(0)
-        merkle_proof_text = Text("Merkle Proof", font_size=18, color=BLUE).move_to(reversed_line.get_start())
+        merkle_proof_text = cached_text("Merkle Proof", font_size=18, color=BLUE).move_to(reversed_line.get_start())
 
-        explanation_7 = Text(
+        explanation_7 = cached_text(
             "The server sends the Merkle Proof back to the user.",
             font_size=25
         ).to_edge(DOWN)
@@ -1104,11 +1269,14 @@ class MerkleTreePresentation(Slide):
         self.next_slide()
 
         proof_blocks = VGroup()
-        proof_labels = ["h1", "h2", "h34"]
+        spv_proof = SPV_TREE.prove(0)
+        proof_labels = [node_label(0, spv_proof.index)] + [
+            node_label(level, (spv_proof.index >> level) ^ 1) for level in range(len(spv_proof.siblings))
+        ]
 
         for i, label in enumerate(proof_labels):
             rect = Square(side_length=1.0, color=BLUE)
-            text = Text(label).scale(0.6)
+            text = cached_text(label).scale(0.6)
             text.move_to(rect.get_center())
 
             if i == 0:
@@ -1121,7 +1289,7 @@ class MerkleTreePresentation(Slide):
         self.play(FadeIn(VGroup(merkle_proof[1], merkle_proof[2])))
         self.next_slide()
 
-        explanation_8 = Text(
+        explanation_8 = cached_text(
             "The user combines the provided sibling hashes to reconstruct the Merkle Root.",
             font_size=25
         ).to_edge(DOWN)
@@ -1130,7 +1298,7 @@ class MerkleTreePresentation(Slide):
 
         leaf_group = VGroup(merkle_proof[0], merkle_proof[1])
         rect = Square(side_length=1.0, color=BLUE)
-        text = Text("h12").scale(0.6)
+        text = cached_text("h12").scale(0.6)
         text.move_to(rect.get_center())
         parent_node = VGroup(rect, text).next_to(merkle_proof[2], LEFT)
         self.play(FadeIn(merkle_proof[0]))
@@ -1140,20 +1308,22 @@ class MerkleTreePresentation(Slide):
         self.next_slide()
 
         parent_group = VGroup(parent_node, merkle_proof[2])
-        root_hash_text = Text("h1234:", color=BLUE).move_to(merkle_proof.get_center())
-        root_hash_hash = Text("1e61a969e").next_to(root_hash_text, RIGHT, buff=0.1)
+        root_hash_text = cached_text("h1234:", color=BLUE).move_to(merkle_proof.get_center())
+        root_hash_hash = cached_text(
+            digest_to_hex(root_from_proof(SPV_TREE.leaf(0), spv_proof, SPV_TREE.hash_name, SPV_TREE.duplicate_odd))[:9]
+        ).next_to(root_hash_text, RIGHT, buff=0.1)
         root_hash = VGroup(root_hash_text, root_hash_hash)
         self.play(ReplacementTransform(parent_group, root_hash_text))
         self.next_slide()
         self.play(Write(root_hash_hash))
         self.next_slide()
 
-        block_hash_test = Text("Block Hash:", color=ORANGE).next_to(root_hash_text, DOWN, buff=0.5)
-        block_hash_hash = Text("1e61a969e").next_to(block_hash_test, RIGHT, buff=0.1)
+        block_hash_test = cached_text("Block Hash:", color=ORANGE).next_to(root_hash_text, DOWN, buff=0.5)
+        block_hash_hash = cached_text(digest_to_hex(SPV_TREE.root)[:9]).next_to(block_hash_test, RIGHT, buff=0.1)
         block_hash = VGroup(block_hash_test, block_hash_hash)
         self.play(Write(block_hash))
         self.next_slide()
-        explanation_9 = Text(
+        explanation_9 = cached_text(
             "The user compares the root hash with the hash in the block header.",
             font_size=25
         ).to_edge(DOWN)
@@ -1164,19 +1334,21 @@ class MerkleTreePresentation(Slide):
         self.play(Indicate(block_hash_hash, scale_factor=1.5), Indicate(root_hash_hash, scale_factor=1.5))
 
         self.next_slide()
-        explanation_10 = Text(
+        explanation_10 = cached_text(
             "The transaction is confirmed to be included in the block.",
             font_size=25
         ).to_edge(DOWN)
 
-        check_mark = Text("✓", font_size=36, color=GREEN).move_to(question_mark.get_center())
+        check_mark = cached_text("✓", font_size=36, color=GREEN).move_to(question_mark.get_center())
         self.play(ReplacementTransform(explanation_9, explanation_10), ReplacementTransform(question_mark, check_mark))
         self.next_slide()
 
         self.play(FadeOut(explanation_10), FadeOut(check_mark), FadeOut(root_hash, block_hash),
                   FadeOut(user_device, user_text))
         self.next_slide()
+        return slide_11_title
 
+    def benefits_and_quiz(self, slide_11_title):
         # ########################################
         # #         Slide 12: Example Usage - DBMS
         #
@@ -1187,6 +1359,7 @@ class MerkleTreePresentation(Slide):
 
         ########################################
         #         Slide 13: Benefits of Merkle Trees
+        self.chapter("Benefits of Merkle Trees")
 
         # Transform the title
         slide_13_title = create_title("Benefits of Merkle Trees")
@@ -1209,7 +1382,7 @@ class MerkleTreePresentation(Slide):
 
         bullet_points = VGroup()
         for i, (benefit, highlights) in enumerate(benefits):
-            bullet = Text(f"• {benefit}", font_size=32, t2c=highlights)
+            bullet = cached_text(f"• {benefit}", font_size=32, t2c=highlights)
             bullet.align_to(slide_13_title, LEFT)
             bullet.shift(UP * 2 + DOWN * (i * 0.6))
             bullet_points.add(bullet)
@@ -1225,6 +1398,7 @@ class MerkleTreePresentation(Slide):
 
         ########################################
         #         Slide 14: Take Home message
+        self.chapter("Questions")
 
         # Transform the title
         slide_14_title = create_title("Questions?").move_to(ORIGIN)
@@ -1233,8 +1407,81 @@ class MerkleTreePresentation(Slide):
 
         ########################################
         #         Slide 15: Quiz Time
+        self.chapter("Quiz Time")
 
         # Transform the title
         slide_15_title = create_title("Quiz Time!").move_to(ORIGIN)
         self.play(Transform(slide_14_title, slide_15_title, replace_mobject_with_target_in_scene=True))
         self.next_slide()
+
+
+class MerkleTreePresentation(MerkleTreeSlide):
+    def construct(self):
+        title = self.title_and_agenda()
+        title = self.hash_functions(title)
+        title = self.building_blocks(title)
+        title = self.how_it_works(title)
+        title = self.bittorrent(title)
+        title = self.bitcoin(title)
+        self.benefits_and_quiz(title)
+
+
+class TitleSection(MerkleTreeSlide):
+    chapters = ("Title Slide", "Agenda", "The Problem")
+
+    def construct(self):
+        self.title_and_agenda()
+
+
+class HashFunctionsSection(MerkleTreeSlide):
+    chapters = ("Introduction to Hash Functions",)
+
+    def construct(self):
+        self.hash_functions(self.resume_from("The Problem"))
+
+
+class BuildingBlocksSection(MerkleTreeSlide):
+    chapters = ("Building Blocks of Merkle Trees", "What is a Merkle Tree?")
+
+    def construct(self):
+        self.building_blocks(self.resume_from("Hash Function as a Digital Fingerprint"))
+
+
+class HowItWorksSection(MerkleTreeSlide):
+    chapters = ("How Merkle Trees Work",)
+
+    def construct(self):
+        self.how_it_works(self.resume_from("What is a Merkle Tree? "))
+
+
+class BitTorrentSection(MerkleTreeSlide):
+    chapters = ("Example Usage - BitTorrent",)
+
+    def construct(self):
+        self.bittorrent(self.resume_from("How Merkle Trees Work"))
+
+
+class BitcoinSection(MerkleTreeSlide):
+    chapters = ("Example Usage - Bitcoin", "Bitcoin SPV")
+
+    def construct(self):
+        self.bitcoin(self.resume_from("Example Usage - BitTorrent"))
+
+
+class BenefitsSection(MerkleTreeSlide):
+    chapters = ("Benefits of Merkle Trees", "Questions", "Quiz Time")
+
+    def construct(self):
+        self.benefits_and_quiz(self.resume_from("Example Usage - Bitcoin"))
+
+
+# Deck order used by render.py when the sections are rendered separately
+SECTIONS = [
+    TitleSection,
+    HashFunctionsSection,
+    BuildingBlocksSection,
+    HowItWorksSection,
+    BitTorrentSection,
+    BitcoinSection,
+    BenefitsSection,
+]
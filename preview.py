@@ -0,0 +1,57 @@
+import argparse
+import os
+import re
+import sys
+
+import render
+from presentation import CHAPTERS, PREVIEW_ENV, SECTIONS
+
+
+def select_chapters(selection):
+    """Return the indices of the first and last chapter matching a selection.
+
+    A selection is a slide number or range ("9", "9-11") or part of a chapter
+    title ("Bitcoin SPV").
+    """
+    match = re.fullmatch(r"(\d+)(?:-(\d+))?", selection.strip())
+    if match:
+        low, high = int(match[1]), int(match[2] or match[1])
+        indices = [i for i, (first, last, _) in enumerate(CHAPTERS) if first <= high and low <= last]
+    else:
+        indices = [i for i, (_, _, title) in enumerate(CHAPTERS) if selection.lower() in title.lower()]
+    if not indices:
+        raise ValueError(f"No slides match {selection!r}")
+    return indices[0], indices[-1]
+
+
+def sections_for(first, last):
+    titles = {title for _, _, title in CHAPTERS[first:last + 1]}
+    return [section.__name__ for section in SECTIONS if titles.intersection(section.chapters)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render only some slides of the presentation as a quick draft.")
+    parser.add_argument("selection", help='slide number, range or title, e.g. "9-11" or "Bitcoin SPV"')
+    parser.add_argument("-q", "--quality", choices=render.QUALITY_FLAGS, default="low")
+    parser.add_argument("-o", "--output", default="preview.html")
+    parser.add_argument("--open", action="store_true", help="open the converted preview")
+    args = parser.parse_args()
+
+    try:
+        first, last = select_chapters(args.selection)
+    except ValueError as e:
+        sys.exit(str(e))
+    names = sections_for(first, last)
+    print(f"Previewing {CHAPTERS[first][2]!r} to {CHAPTERS[last][2]!r} from {', '.join(names)}")
+
+    # The section processes inherit the range and skip everything outside it.
+    # Previews are never stored in the render cache.
+    os.environ[PREVIEW_ENV] = f"{first}:{last}"
+    failed = render.render_sections(names, args.quality)
+    if failed:
+        sys.exit(f"Failed to render: {', '.join(failed)}")
+    sys.exit(render.convert(names, args.output, args.open))
+
+
+if __name__ == "__main__":
+    main()
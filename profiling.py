@@ -0,0 +1,118 @@
+import json
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Set to a directory to have every scene write a profile of its render there
+PROFILE_ENV = "MERKLE_PROFILE"
+
+
+def peak_rss():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux but in bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def describe(animations):
+    names = []
+    for animation in animations:
+        if hasattr(animation, "mobject") and animation.mobject is not None:
+            names.append(f"{type(animation).__name__}({type(animation.mobject).__name__})")
+        else:
+            names.append(type(animation).__name__)
+    return ", ".join(names)
+
+
+class RenderProfiler:
+    """Record the cost of every play/wait call of a scene.
+
+    Each call records the slide it belongs to, the line of the slide code that
+    made it, its wall time, the number of frames written (0 when manim skipped
+    or reused a cached animation), the number of mobjects on screen and the
+    peak RSS of the render process so far.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.calls = []
+        self.started = time.perf_counter()
+        self._depth = 0
+        self._call = None
+
+    def start(self, scene, kind, animations, line):
+        # Scene.wait goes through play, only the outermost call is recorded
+        self._depth += 1
+        if self._depth > 1:
+            return
+        self._call = {
+            "slide": len(scene._slides),
+            "kind": kind,
+            "line": line,
+            "animations": describe(animations),
+            "start": time.perf_counter(),
+            "scene_time": scene.renderer.time,
+        }
+
+    def stop(self, scene):
+        self._depth -= 1
+        if self._depth > 0:
+            return
+        call, self._call = self._call, None
+        duration = scene.renderer.time - call.pop("scene_time")
+        call["wall_time"] = time.perf_counter() - call.pop("start")
+        call["frames"] = 0 if scene.renderer.skip_animations else round(duration * scene.camera.frame_rate)
+        call["mobjects"] = len(scene.get_mobject_family_members())
+        call["peak_rss"] = peak_rss()
+        self.calls.append(call)
+
+    def slides(self):
+        slides = {}
+        for call in self.calls:
+            slide = slides.setdefault(call["slide"], {"slide": call["slide"], "wall_time": 0.0, "frames": 0, "calls": 0})
+            slide["wall_time"] += call["wall_time"]
+            slide["frames"] += call["frames"]
+            slide["calls"] += 1
+        return list(slides.values())
+
+    def report(self, scene_name):
+        return {
+            "scene": scene_name,
+            "wall_time": time.perf_counter() - self.started,
+            "peak_rss": peak_rss(),
+            "slides": self.slides(),
+            "calls": self.calls,
+        }
+
+    def summary(self, report, limit=20):
+        lines = [
+            f"{report['scene']}: {report['wall_time']:.1f}s, {len(report['calls'])} calls, "
+            f"{len(report['slides'])} slides, peak RSS {(report['peak_rss'] or 0) / 2 ** 20:.0f} MB",
+            "",
+            "Slowest slides:",
+        ]
+        for slide in sorted(report["slides"], key=lambda s: s["wall_time"], reverse=True)[:limit]:
+            lines.append(f"  slide {slide['slide']:>3}  {slide['wall_time']:8.2f}s  {slide['frames']:6} frames  {slide['calls']:3} calls")
+        lines += ["", "Slowest calls:"]
+        for call in sorted(report["calls"], key=lambda c: c["wall_time"], reverse=True)[:limit]:
+            lines.append(
+                f"  line {call['line']:>5}  {call['wall_time']:8.2f}s  {call['frames']:6} frames  "
+                f"{call['mobjects']:5} mobjects  {call['kind']} {call['animations']}"
+            )
+        return "\n".join(lines) + "\n"
+
+    def write(self, scene_name):
+        os.makedirs(self.directory, exist_ok=True)
+        report = self.report(scene_name)
+        path = os.path.join(self.directory, scene_name)
+        with open(path + ".json", "w") as f:
+            json.dump(report, f, indent=2)
+        with open(path + ".txt", "w") as f:
+            f.write(self.summary(report))
+        return path + ".txt"
@@ -0,0 +1,9 @@
+# manim render flags of every quality, kept apart from render.py so tools
+# that do not render the deck need not import manim
+QUALITY_FLAGS = {
+    "low": "-ql",
+    "medium": "-qm",
+    "high": "-qh",
+    "production": "-qp",
+    "4k": "-qk",
+}
@@ -0,0 +1,88 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+import webbrowser
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import deck_html
+import render_cache
+import reproducible
+import stills
+from profiling import PROFILE_ENV
+from presentation import SECTIONS, MerkleTreePresentation
+from quality import QUALITY_FLAGS
+
+
+def render_section(name, quality):
+    # Every section is rendered by its own manim-slides process, the pool only
+    # decides how many of them run at the same time.
+    start = time.perf_counter()
+    result = subprocess.run(
+        ["manim-slides", "render", QUALITY_FLAGS[quality], "presentation.py", name],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    return name, result.returncode, time.perf_counter() - start, result.stdout
+
+
+def render_sections(names, quality="high", jobs=None, keys=None):
+    keys = keys or {}
+    failed = []
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        futures = []
+        for name in names:
+            if name in keys and render_cache.restore(name, keys[name]):
+                print(f"{name}: cached")
+            else:
+                futures.append(pool.submit(render_section, name, quality))
+        for future in as_completed(futures):
+            name, returncode, elapsed, output = future.result()
+            if returncode != 0:
+                failed.append(name)
+                print(output, file=sys.stderr)
+            elif name in keys:
+                render_cache.store(name, keys[name])
+            print(f"{name}: {'FAILED' if returncode else 'ok'} in {elapsed:.1f}s")
+    return failed
+
+
+def convert(names, output, open_browser=False):
+    returncode = subprocess.run(["manim-slides", "convert", *names, output]).returncode
+    if returncode != 0:
+        return returncode
+    deck_html.fix_asset_paths(names, output)
+    print(f"{stills.apply_stills(names, output)} still slides shown as images")
+    if open_browser:
+        webbrowser.open(f"file://{os.path.abspath(output)}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the presentation sections in parallel and stitch them together.")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of sections rendered at once")
+    parser.add_argument("-q", "--quality", choices=QUALITY_FLAGS, default="high")
+    parser.add_argument("-o", "--output", default="presentation.html")
+    parser.add_argument("--open", action="store_true", help="open the converted presentation")
+    parser.add_argument("--no-cache", action="store_true", help="render every section even if it did not change")
+    parser.add_argument("--profile", metavar="DIR", help="write a render profile of every section to DIR (implies --no-cache)")
+    parser.add_argument("--deterministic", action="store_true",
+                        help="freeze the slide clock and seed all random choices")
+    args = parser.parse_args()
+
+    if args.deterministic:
+        reproducible.enable_for_subprocesses()
+    if args.profile:
+        os.environ[PROFILE_ENV] = os.path.abspath(args.profile)
+    names = [section.__name__ for section in SECTIONS]
+    keys = {} if args.no_cache or args.profile else render_cache.section_keys(MerkleTreePresentation, SECTIONS, args.quality)
+    failed = render_sections(names, args.quality, args.jobs, keys)
+    if failed:
+        sys.exit(f"Failed to render: {', '.join(failed)}")
+    sys.exit(convert(names, args.output, args.open))
+
+
+if __name__ == "__main__":
+    main()
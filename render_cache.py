@@ -0,0 +1,144 @@
+import hashlib
+import inspect
+import os
+import re
+import shutil
+import subprocess
+import sys
+from importlib.metadata import PackageNotFoundError, version
+
+from reproducible import EPOCH_ENV
+
+CACHE_DIR = ".render_cache"
+SLIDES_DIR = "slides"
+
+IMAGE_PATTERN = re.compile(r"""["']((?:\w+/)*\w+\.(?:png|jpe?g|svg))["']""")
+FONT_PATTERN = re.compile(r"""font\s*=\s*["']([^"']+)["']""")
+CLOCK_PATTERN = re.compile(r"\brender_clock\(")
+
+_file_digests = {}
+_font_files = {}
+
+
+def file_digest(path):
+    if path not in _file_digests:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        _file_digests[path] = digest.hexdigest()
+    return _file_digests[path]
+
+
+def font_file(family):
+    # Text without an explicit font uses the system default sans-serif font
+    if family not in _font_files:
+        try:
+            _font_files[family] = subprocess.run(
+                ["fc-match", "--format=%{file}", family or "sans-serif"],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+            ).stdout.strip()
+        except OSError:
+            _font_files[family] = ""
+    return _font_files[family]
+
+
+def _package_version(name):
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return ""
+
+
+def _called_methods(function):
+    return re.findall(r"self\.(\w+)\(", inspect.getsource(function))
+
+
+def _local_modules(module):
+    # Other modules of this repository the slides import (e.g. for hash labels)
+    root = os.path.dirname(os.path.abspath(module.__file__))
+    for name, imported in sorted(sys.modules.items()):
+        path = getattr(imported, "__file__", None)
+        if imported is module or not path or not path.endswith(".py"):
+            continue
+        if os.path.dirname(os.path.abspath(path)) == root:
+            yield name, path
+
+
+def section_keys(deck, sections, quality):
+    """Return a cache key for every section scene.
+
+    A key covers the section's own slide code, the code it shares with the
+    other sections, the images and fonts it uses, the render quality,
+    whether the render is deterministic and, for the sections that show the
+    time, the clock of deterministic renders.
+    """
+    module = inspect.getmodule(deck)
+    module_lines = inspect.getsource(module).splitlines(keepends=True)
+    section_methods = [
+        getattr(deck, name) for name in _called_methods(deck.construct) if hasattr(deck, name)
+    ]
+
+    # Shared code is the module without the bodies of the section methods
+    shared_lines = list(module_lines)
+    for method in section_methods:
+        lines, start = inspect.getsourcelines(method)
+        shared_lines[start - 1:start - 1 + len(lines)] = [None] * len(lines)
+    shared = "".join(line for line in shared_lines if line is not None)
+
+    common = hashlib.sha256()
+    # Seeded renders are only reused by seeded renders
+    deterministic = "deterministic" if EPOCH_ENV in os.environ else ""
+    for part in (quality, deterministic, _package_version("manim"), _package_version("manim-slides"), shared):
+        common.update(part.encode())
+        common.update(b"\0")
+    for name, path in _local_modules(module):
+        common.update(f"{name}:{file_digest(path)}\0".encode())
+
+    keys = {}
+    for section in sections:
+        source = inspect.getsource(section) + "".join(
+            inspect.getsource(getattr(section, name))
+            for name in _called_methods(section.construct)
+            if getattr(deck, name, None) in section_methods
+        )
+        key = common.copy()
+        key.update(source.encode())
+        if CLOCK_PATTERN.search(source):
+            key.update(f"clock:{os.environ.get(EPOCH_ENV, '')}\0".encode())
+        for image in sorted(set(IMAGE_PATTERN.findall(source + shared))):
+            key.update(f"{image}:{file_digest(image)}\0".encode())
+        for family in sorted(set(FONT_PATTERN.findall(source + shared)) | {""}):
+            font = font_file(family)
+            key.update(f"{family}:{file_digest(font) if font else ''}\0".encode())
+        keys[section.__name__] = key.hexdigest()
+    return keys
+
+
+def _scene_outputs(name):
+    return os.path.join(SLIDES_DIR, f"{name}.json"), os.path.join(SLIDES_DIR, "files", name)
+
+
+def restore(name, key):
+    """Put the cached slides of a scene back in place, return whether it was cached."""
+    entry = os.path.join(CACHE_DIR, key)
+    if not os.path.isdir(entry):
+        return False
+    config, files = _scene_outputs(name)
+    os.makedirs(os.path.dirname(config), exist_ok=True)
+    shutil.copyfile(os.path.join(entry, "slides.json"), config)
+    shutil.rmtree(files, ignore_errors=True)
+    shutil.copytree(os.path.join(entry, "files"), files)
+    return True
+
+
+def store(name, key):
+    config, files = _scene_outputs(name)
+    entry = os.path.join(CACHE_DIR, key)
+    partial = entry + ".partial"
+    shutil.rmtree(partial, ignore_errors=True)
+    os.makedirs(partial)
+    shutil.copyfile(config, os.path.join(partial, "slides.json"))
+    shutil.copytree(files, os.path.join(partial, "files"))
+    shutil.rmtree(entry, ignore_errors=True)
+    os.replace(partial, entry)
@@ -0,0 +1,46 @@
+import datetime
+import os
+import random
+
+import numpy as np
+
+# Set as in reproducible builds (https://reproducible-builds.org/specs/source-date-epoch/)
+# to freeze the clock of the slides and seed every random choice.
+EPOCH_ENV = "SOURCE_DATE_EPOCH"
+SEED = 2024
+# Clock of deterministic renders unless SOURCE_DATE_EPOCH is set: the time of
+# the Bitcoin genesis block. Fixed, so identical source renders identical frames.
+EPOCH = 1231006505
+
+
+def deterministic():
+    return EPOCH_ENV in os.environ
+
+
+def render_clock():
+    """Current time for the slides, frozen at SOURCE_DATE_EPOCH in deterministic mode."""
+    if deterministic():
+        return datetime.datetime.fromtimestamp(int(os.environ[EPOCH_ENV]), datetime.timezone.utc).replace(tzinfo=None)
+    return datetime.datetime.now()
+
+
+def make_rng():
+    return random.Random(SEED if deterministic() else None)
+
+
+def seed_everything():
+    # For the random and np.random calls made by manim itself
+    random.seed(SEED)
+    np.random.seed(SEED)
+
+
+def enable_for_subprocesses():
+    """Make the renders started from now on deterministic.
+
+    The clock is frozen at EPOCH unless SOURCE_DATE_EPOCH is already set.
+    PYTHONHASHSEED is fixed as well, so sets and everything keyed by str
+    hashes (such as manim's hashing memo) iterate in the same
+    order in every render process.
+    """
+    os.environ.setdefault(EPOCH_ENV, str(EPOCH))
+    os.environ["PYTHONHASHSEED"] = "0"
@@ -0,0 +1,127 @@
+import argparse
+import ast
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from quality import QUALITY_FLAGS
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SANDBOX_FILES = [os.path.join(ROOT, "sandbox.py"), *sorted(glob.glob(os.path.join(ROOT, "sandbox", "*.py")))]
+MEDIA_DIR = os.path.join(ROOT, ".sandbox_media")
+
+SCENE_BASES = {"Scene", "MovingCameraScene", "ThreeDScene", "ZoomedScene", "Slide", "ThreeDSlide"}
+
+
+def _base_name(node):
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def find_scenes(path):
+    """Return the names of the Scene subclasses defined in a file, without importing it.
+
+    Importing the sandbox modules would run their module level code (some
+    hash whole files), so the classes are found in the syntax tree instead.
+    Subclasses of scenes defined in the same file count as scenes too.
+    """
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    classes = [node for node in tree.body if isinstance(node, ast.ClassDef)]
+    scenes = []
+    known = set(SCENE_BASES)
+    # Repeat until no new scene is found, local base classes can come later in the file
+    changed = True
+    while changed:
+        changed = False
+        for node in classes:
+            if node.name not in known and any(_base_name(base) in known for base in node.bases):
+                known.add(node.name)
+                scenes.append(node)
+                changed = True
+    return [node.name for node in sorted(scenes, key=lambda node: node.lineno)]
+
+
+def render_scene(path, scene, quality, timeout):
+    # Scenes load their images relative to their own directory. Every file
+    # gets its own media directory, sandbox.py exists twice with the same scene.
+    start = time.perf_counter()
+    media_dir = os.path.join(MEDIA_DIR, os.path.splitext(os.path.relpath(path, ROOT))[0])
+    command = [
+        "manim", "render", QUALITY_FLAGS[quality], "--media_dir", media_dir, "--progress_bar", "none",
+        os.path.basename(path), scene,
+    ]
+    try:
+        result = subprocess.run(
+            command, cwd=os.path.dirname(path), stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+            timeout=timeout,
+        )
+        returncode, output = result.returncode, result.stdout
+    except subprocess.TimeoutExpired as e:
+        returncode, output = "timeout", e.stdout or ""
+        if isinstance(output, bytes):
+            output = output.decode(errors="replace")
+    return {
+        "file": os.path.relpath(path, ROOT),
+        "scene": scene,
+        "ok": returncode == 0,
+        "returncode": returncode,
+        "seconds": time.perf_counter() - start,
+        "output": output,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render every sandbox scene headless and summarise the results.")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of scenes rendered at once")
+    parser.add_argument("-q", "--quality", choices=QUALITY_FLAGS, default="low")
+    parser.add_argument("-k", "--filter", default="", help="only render scenes whose file or name contains this")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds after which a scene counts as failed")
+    parser.add_argument("--list", action="store_true", help="only list the scenes that would be rendered")
+    parser.add_argument("--report", help="also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    jobs = [
+        (path, scene) for path in SANDBOX_FILES for scene in find_scenes(path)
+        if args.filter.lower() in f"{os.path.relpath(path, ROOT)} {scene}".lower()
+    ]
+    if args.list:
+        for path, scene in jobs:
+            print(f"{os.path.relpath(path, ROOT)}: {scene}")
+        return
+
+    results = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.jobs or os.cpu_count()) as pool:
+        futures = [pool.submit(render_scene, path, scene, args.quality, args.timeout) for path, scene in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"{result['file']}:{result['scene']}: {'ok' if result['ok'] else 'FAILED'} in {result['seconds']:.1f}s")
+    elapsed = time.perf_counter() - start
+
+    failed = [result for result in results if not result["ok"]]
+    for result in failed:
+        print(f"\n==> {result['file']}:{result['scene']} ({result['returncode']})", file=sys.stderr)
+        print("\n".join(result["output"].splitlines()[-30:]), file=sys.stderr)
+
+    print(f"\n{'scene':<48} {'seconds':>8}  status")
+    for result in sorted(results, key=lambda r: r["seconds"], reverse=True):
+        print(f"{result['file'] + ':' + result['scene']:<48} {result['seconds']:8.1f}  {'ok' if result['ok'] else 'FAILED'}")
+    print(f"{len(results) - len(failed)}/{len(results)} scenes rendered in {elapsed:.1f}s")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(sorted(results, key=lambda r: (r["file"], r["scene"])), f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,16 @@
 import datetime
 import hashlib
+import os
+import sys
 
 from manim import *
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bitcoin import block_tree, digest_to_hex, txid
+
+BLOCK_TXIDS = [txid(f"Tx {i + 1}".encode()) for i in range(16)]
+BLOCK_TREE = block_tree(BLOCK_TXIDS)
+
 
 class BitcoinTransactionsBlock(Scene):
     def construct(self):
@@ -24,15 +32,14 @@ class BitcoinTransactionsBlock(Scene):
 
         transaction_hashes = VGroup()
         for i in range(16):
-            tx_hash = hashlib.sha256(f"Tx {i + 1}".encode()).hexdigest()[:5]
+            tx_hash = BLOCK_TXIDS[i][:5]
             hash_text = Text(f"{tx_hash}..", font_size=20, color=ORANGE)
             transaction_hashes.add(hash_text)
         transaction_hashes.arrange_in_grid(rows=4, buff=0.7).move_to(bitcoin_block.get_center())
         self.play(ReplacementTransform(transactions, transaction_hashes))
         self.wait(2)
 
-        combined_hash_input = ''.join([hashlib.sha256(f"Tx {i + 1}".encode()).hexdigest() for i in range(16)])
-        merkle_root_hash = hashlib.sha256(combined_hash_input.encode()).hexdigest()[:15]
+        merkle_root_hash = digest_to_hex(BLOCK_TREE.root)[:15]
         merkle_root = Text(f"Root Hash: {merkle_root_hash}...", font_size=25, color=ORANGE).move_to(bitcoin_block.get_center())
         self.play(ReplacementTransform(transaction_hashes, merkle_root))
         self.wait(1)
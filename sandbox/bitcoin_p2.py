@@ -1,9 +1,15 @@
-import random
-from tkinter.constants import BOTTOM
-from tkinter.tix import Select
+import os
+import sys
 
 from manim import *
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bitcoin import block_tree, digest_to_hex, txid
+from mobjects import NetworkGraph
+
+SPV_TXIDS = [txid(f"Tx {i + 1}".encode()) for i in range(4)]
+SPV_TREE = block_tree(SPV_TXIDS)
+
 
 class BitcoinTransactionsBlock(Scene):
     def construct(self):
@@ -25,29 +31,9 @@ class BitcoinTransactionsBlock(Scene):
         bitcoin_image = ImageMobject("img/bitcoin.png").scale(0.2).move_to(RIGHT * 3)
 
         # Network Representation: Nodes Around Bitcoin Image
-        network_nodes = VGroup()
-        angles = np.linspace(0, 2 * PI, 25, endpoint=False)
-        radius = 2
-
-        # Create Nodes Around Bitcoin Image
-        for angle in angles:
-            node = Dot(radius=0.1).set_color(BLUE).set_z_index(10)
-            node.move_to(bitcoin_image.get_center() + radius * np.array([np.cos(angle), np.sin(angle), 0]))
-            network_nodes.add(node)
-
-        # Connect Nodes to Form a Network Graph
-        network_lines = VGroup()
-        for i, node in enumerate(network_nodes):
-            next_node = network_nodes[(i + 1) % len(network_nodes)]
-            line = Line(node.get_center(), next_node.get_center()).set_z_index(-1)
-            network_lines.add(line)
-
-        # Randomly connect nodes to form a network
-        for i in range(35):
-            node1 = random.choice(network_nodes)
-            node2 = random.choice(network_nodes)
-            line = Line(node1.get_center(), node2.get_center()).set_z_index(-1)
-            network_lines.add(line)
+        network = NetworkGraph.ring(25, radius=2, extra_edges=35, center=bitcoin_image.get_center(), node_color=BLUE)
+        network_nodes = network.nodes.set_z_index(10)
+        network_lines = network.edges.set_z_index(-1)
 
         self.play(Create(network_nodes), Create(network_lines))
         self.play(FadeIn(bitcoin_image))
@@ -60,7 +46,7 @@ class BitcoinTransactionsBlock(Scene):
         self.play(Write(explanation_1))
 
         # Merkle Path to Root
-        network_node = network_nodes[-10]
+        network_node = network.node_dot(-10).set_z_index(10)
         self.play(network_node.animate.set_color(ORANGE))
 
         explanation_2 = Text(
@@ -73,7 +59,7 @@ class BitcoinTransactionsBlock(Scene):
         self.play(Create(path_line))
 
         line = Line(path_line.get_start() + UP * 0.2, path_line.get_end() + UP * 0.2).set_opacity(0)
-        transaction_hash = Text("TXN: 8a9f12...", font_size=18, color=BLUE).move_to(line.get_start())
+        transaction_hash = Text(f"TXN: {SPV_TXIDS[0][:6]}...", font_size=18, color=BLUE).move_to(line.get_start())
         self.play(MoveAlongPath(transaction_hash, line), run_time=2)
         self.play(FadeOut(transaction_hash))
         self.wait(1)
@@ -233,12 +219,12 @@ class BitcoinTransactionsBlock(Scene):
 
         parent_group = VGroup(parent_node, merkle_proof[2])
         root_hash_text = Text("Merkle Root: ").move_to(merkle_proof.get_center())
-        root_hash_hash = Text("1e61a969e").next_to(root_hash_text, RIGHT, buff=0.1)
+        root_hash_hash = Text(digest_to_hex(SPV_TREE.root)[:9]).next_to(root_hash_text, RIGHT, buff=0.1)
         root_hash = VGroup(root_hash_text, root_hash_hash)
         self.play(ReplacementTransform(parent_group, root_hash))
 
         block_hash_test = Text("Block Hash:").next_to(root_hash, DOWN, buff=0.5)
-        block_hash_hash = Text("1e61a969e").next_to(block_hash_test, RIGHT, buff=0.1)
+        block_hash_hash = Text(digest_to_hex(SPV_TREE.root)[:9]).next_to(block_hash_test, RIGHT, buff=0.1)
         block_hash = VGroup(block_hash_test, block_hash_hash)
         self.play(Write(block_hash))
 
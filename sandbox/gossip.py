@@ -0,0 +1,53 @@
+import os
+import sys
+
+from manim import *
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mobjects import NetworkGraph
+
+NODE_COUNT = 2000
+
+
+class GossipDemo(Scene):
+    def construct(self):
+        title = Text("A transaction gossiping across the network", font_size=32, weight=BOLD).to_edge(UP)
+        self.play(Write(title))
+
+        network = NetworkGraph.random_geometric(
+            NODE_COUNT,
+            width=13,
+            height=6,
+            neighbours=4,
+            shortcuts=60,
+            center=DOWN * 0.4,
+            seed=2024,
+            node_radius=0.03,
+            node_color=BLUE,
+            edge_color=GREY_D,
+            edge_width=1,
+        )
+        self.play(Create(network.edges), FadeIn(network.nodes), run_time=2)
+
+        source = 0
+        hops = network.hops(source)
+        self.play(FadeIn(network.node_dot(source, color=YELLOW).scale(3)))
+
+        # One animation per gossip round, whatever the number of nodes
+        counter = Text("round 0: 1 node", font_size=24).to_edge(DOWN)
+        self.add(counter)
+        for hop in range(1, hops.max() + 1):
+            reached = network.nodes_subset(hops == hop, fill_color=YELLOW)
+            links = network.edges_subset(network.gossip_edges(hops, hop), stroke_color=YELLOW)
+            informed = int(((hops >= 0) & (hops <= hop)).sum())
+            self.play(
+                Create(links),
+                FadeIn(reached),
+                Transform(counter, Text(f"round {hop}: {informed} nodes", font_size=24).to_edge(DOWN)),
+                run_time=0.3,
+            )
+        self.wait(2)
+
+
+if __name__ == "__main__":
+    os.system("manim -qm -p gossip.py GossipDemo")
@@ -0,0 +1,48 @@
+import os
+import sys
+
+from manim import *
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from merkle import MerkleTree
+from mobjects import MerkleTreeMobject
+
+
+class LargeMerkleTreeDemo(Scene):
+    def construct(self):
+        title = Text("From 8 to 1024 leaves", weight=BOLD).to_edge(UP)
+        self.play(Write(title))
+
+        small = MerkleTreeMobject.from_tree(
+            MerkleTree(f"Tx {i + 1}".encode() for i in range(8)),
+            hash_length=4,
+            font_size=16,
+            height=4.5,
+        ).shift(DOWN * 0.5)
+        self.play(Create(small.edges), Create(small.nodes), run_time=2)
+        self.play(Write(small.labels))
+        self.wait(1)
+
+        # Bigger trees: only the two batched outlines are created and transformed
+        tree = small
+        for leaf_count in (64, 256, 1024):
+            bigger = MerkleTreeMobject(leaf_count, height=4.5).shift(DOWN * 0.5)
+            count = Text(f"{leaf_count} leaves", font_size=28).to_edge(DOWN)
+            self.play(
+                ReplacementTransform(tree, bigger),
+                FadeIn(count),
+                run_time=2,
+            )
+            self.wait(0.5)
+            self.play(FadeOut(count))
+            tree = bigger
+
+        # Follow one leaf up to the root
+        path = tree.path_edges(700, stroke_color=YELLOW, stroke_width=6)
+        leaf = Dot(tree.node_center(0, 700), color=YELLOW)
+        self.play(Create(leaf), Create(path), run_time=2)
+        self.wait(2)
+
+
+if __name__ == "__main__":
+    os.system("manim -qm -p large_tree.py LargeMerkleTreeDemo")
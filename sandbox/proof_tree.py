@@ -0,0 +1,44 @@
+import os
+import sys
+
+from manim import *
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bitcoin import block_tree, digest_to_hex, txid
+from mobjects import ProofTreeMobject
+
+# A block of realistic size, the diagram only grows with log2 of it
+TX_COUNT = 4000
+TX_INDEX = 2024
+
+BLOCK_TXIDS = [txid(f"Tx {i + 1}".encode()) for i in range(TX_COUNT)]
+BLOCK_TREE = block_tree(BLOCK_TXIDS)
+
+
+class ProofTreeDemo(Scene):
+    def construct(self):
+        title = Text(f"Proving 1 of {TX_COUNT} transactions", font_size=36, weight=BOLD).to_edge(UP)
+        self.play(Write(title))
+
+        proof_tree = ProofTreeMobject(
+            BLOCK_TREE,
+            TX_INDEX,
+            height=6,
+            font_size=12,
+            label=lambda level, index: digest_to_hex(BLOCK_TREE.node(level, index))[:8],
+        ).scale(0.95).next_to(title, DOWN, buff=0.2)
+        self.play(Create(proof_tree.edges), FadeIn(proof_tree.path_nodes, proof_tree.labels))
+        self.wait(1)
+
+        # The verifier only needs the siblings, one per level
+        for sibling in proof_tree.siblings:
+            self.play(FadeIn(sibling, shift=UP * 0.2), run_time=0.3)
+
+        count = Text(f"{len(proof_tree.siblings)} hashes instead of {TX_COUNT}", font_size=28, color=YELLOW)
+        count.to_edge(DOWN, buff=0.2)
+        self.play(Write(count))
+        self.wait(2)
+
+
+if __name__ == "__main__":
+    os.system("manim -qm -p proof_tree.py ProofTreeDemo")
@@ -1,5 +1,22 @@
+import os
+import sys
+
 from manim import *
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from merkle import MerkleTree
+from pieces import hash_file
+
+# Set TORRENT_FILE to run the demo against a real file on disk
+TORRENT_FILE = os.environ.get("TORRENT_FILE")
+if TORRENT_FILE:
+    TORRENT_TREE = hash_file(TORRENT_FILE)
+    FILE_LABEL = f"{os.path.basename(TORRENT_FILE)} {os.path.getsize(TORRENT_FILE) / 1e9:.1f}GB"
+else:
+    TORRENT_TREE = MerkleTree(f"Chunk {i + 1}".encode() for i in range(4))
+    FILE_LABEL = "File.mkv 30GB"
+
+
 class MerkleTreeTorrentDemo(Scene):
     def construct(self):
         title = Text(
@@ -13,8 +30,8 @@ class MerkleTreeTorrentDemo(Scene):
 
         # Animation 1: Large File with a Hash
         file_box = Square().scale(1.5).set_fill(BLUE, opacity=0.5)
-        file_label = Text("File.mkv 30GB").next_to(file_box, UP)
-        file_hash = Text("Merkle Root: f2f5f5426").next_to(file_box, DOWN)
+        file_label = Text(FILE_LABEL).next_to(file_box, UP)
+        file_hash = Text(f"Merkle Root: {TORRENT_TREE.hexroot[:9]}").next_to(file_box, DOWN)
         self.play(Create(file_box), Write(file_label), Write(file_hash))
         self.wait(1)
 
@@ -54,7 +71,7 @@ class MerkleTreeTorrentDemo(Scene):
         self.play(ReplacementTransform(chunks, merkle_root_text), FadeOut(chunk_hashes))
         self.wait(1)
 
-        merkle_root_hash = Text("f2f5f5426", color=ORANGE).next_to(merkle_root_text, RIGHT)
+        merkle_root_hash = Text(TORRENT_TREE.hexroot[:9], color=ORANGE).next_to(merkle_root_text, RIGHT)
         merkle_root_group = VGroup(merkle_root_text, merkle_root_hash)
         self.play(Write(merkle_root_group))
         self.wait(1)
@@ -65,7 +82,7 @@ class MerkleTreeTorrentDemo(Scene):
         self.wait(1)
 
         file_text = Text("Merkle Root:").next_to(merkle_root_text, DOWN)
-        file_hash = Text("f2f5f5426").next_to(file_text, RIGHT)
+        file_hash = Text(TORRENT_TREE.hexroot[:9]).next_to(file_text, RIGHT)
         file_text_group = VGroup(file_text, file_hash)
 
         self.play(Write(file_text_group))
@@ -0,0 +1,349 @@
+import argparse
+import os
+import random
+import sys
+import time
+from bisect import bisect_left
+from collections import namedtuple
+from functools import lru_cache
+
+from merkle import digest_size, hash_function
+
+KEY_BITS = 256
+KEY_SIZE = KEY_BITS // 8
+
+# Domain separation between leaves and interior nodes
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+# Proof that ``key`` maps to a value, or to none. ``siblings`` are the sibling
+# digests from the root down to the subtree holding at most one key, in which
+# the path ends. ``leaf`` is the ``(key, value digest)`` of the other key
+# alone in that subtree, or None if the path ends in the key itself or in an
+# empty subtree.
+SparseProof = namedtuple("SparseProof", "siblings leaf")
+
+
+@lru_cache(maxsize=None)
+def empty_hashes(hash_name="sha256"):
+    """Digest of an empty subtree of every height, from 0 (a missing leaf) to the root."""
+    node_hash = hash_function(hash_name)
+    empty = [bytes(digest_size(hash_name))]
+    for _ in range(KEY_BITS):
+        empty.append(node_hash(NODE_PREFIX + empty[-1] + empty[-1]))
+    return empty
+
+
+def key_bytes(key):
+    """Check a key is 256 bits, return it as bytes."""
+    key = bytes(key)
+    if len(key) != KEY_SIZE:
+        raise ValueError(f"keys are {KEY_SIZE} bytes, got {len(key)}")
+    return key
+
+
+def _leaf(node_hash, key, value_digest):
+    return node_hash(LEAF_PREFIX + key + value_digest)
+
+
+def _branch_node(low, high):
+    # Number of the node where two keys part
+    depth = KEY_BITS - (low ^ high).bit_length()
+    return (1 << depth) | (low >> (KEY_BITS - depth))
+
+
+class SparseMerkleTree:
+    """Merkle tree over all 2**256 keys, of which only the set ones are stored.
+
+    Empty subtrees hash to precomputed digests and a subtree holding a single
+    key hashes to that key's leaf, so a tree of n keys has about n interior
+    nodes worth hashing instead of 256 per key. Only the digests of the n - 1
+    branching nodes (those with keys on both sides) are cached, updates only
+    rehash the paths above the changed keys.
+    """
+
+    def __init__(self, items=(), hash_name="sha256"):
+        self.hash_name = hash_name
+        self.node_hash = hash_function(hash_name)
+        self.empty = empty_hashes(hash_name)
+        # Sorted keys as integers, the values and leaf digests by key
+        self._keys = []
+        self._values = {}
+        self._leaves = {}
+        # Digest of every branching node, by node number (1 for the root, 2n
+        # and 2n + 1 for the children of n). The branching nodes are where
+        # neighbouring keys part, one per pair of neighbours.
+        self._nodes = {}
+        self._root = self.empty[KEY_BITS]
+        self.update_many(items)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return int.from_bytes(key_bytes(key), "big") in self._values
+
+    def get(self, key, default=None):
+        return self._values.get(int.from_bytes(key_bytes(key), "big"), default)
+
+    def update(self, key, value):
+        """Set the value of ``key``, or remove it if ``value`` is None."""
+        self.update_many([(key, value)])
+
+    def update_many(self, changes):
+        """Apply many changes, given as a mapping or ``(key, value)`` pairs.
+
+        The changed keys are sorted and the tree is rehashed in one pass, every
+        node above several changed keys once. A value of None removes the key.
+        """
+        if hasattr(changes, "items"):
+            changes = changes.items()
+        node_hash = self.node_hash
+        batch = {}
+        for key, value in changes:
+            batch[int.from_bytes(key_bytes(key), "big")] = value
+        if not batch:
+            return
+        added = []
+        removed = False
+        for key, value in batch.items():
+            if value is None:
+                if self._values.pop(key, None) is not None:
+                    del self._leaves[key]
+                    removed = True
+                continue
+            if key not in self._values:
+                added.append(key)
+            value = bytes(value)
+            self._values[key] = value
+            self._leaves[key] = _leaf(node_hash, key.to_bytes(KEY_SIZE, "big"), node_hash(value))
+        if removed:
+            self._remove_keys()
+        if added:
+            # Two sorted runs, which the sort merges in linear time
+            added.sort()
+            self._keys += added
+            self._keys.sort()
+        dirty = sorted(batch)
+        self._root = self._rehash(0, 0, len(self._keys), dirty, 0, len(dirty))
+
+    def _remove_keys(self):
+        # Drop the removed keys from the sorted keys and the branching nodes
+        # of their neighbour pairs, unless the neighbours left around them
+        # part at the same node
+        keys = []
+        stale, kept = set(), set()
+        gap = False
+        old = self._keys
+        for i, key in enumerate(old):
+            if key in self._values:
+                if gap and keys:
+                    kept.add(_branch_node(keys[-1], key))
+                keys.append(key)
+                gap = False
+                continue
+            gap = True
+            if i:
+                stale.add(_branch_node(old[i - 1], key))
+            if i + 1 < len(old):
+                stale.add(_branch_node(key, old[i + 1]))
+        for node in stale - kept:
+            self._nodes.pop(node, None)
+        self._keys = keys
+
+    def _chain(self, digest, key, branch, depth):
+        # Hash a branching node's digest up to ``depth``, through the nodes
+        # in between which only have ``key``'s side set
+        node_hash = self.node_hash
+        for level in range(branch - 1, depth - 1, -1):
+            sibling = self.empty[KEY_BITS - 1 - level]
+            if key >> (KEY_BITS - 1 - level) & 1:
+                digest = node_hash(NODE_PREFIX + sibling + digest)
+            else:
+                digest = node_hash(NODE_PREFIX + digest + sibling)
+        return digest
+
+    def _rehash(self, depth, lo, hi, dirty, dirty_lo, dirty_hi):
+        # Digest of the subtree at ``depth`` which holds keys[lo:hi] and the
+        # changed keys dirty[dirty_lo:dirty_hi]
+        count = hi - lo
+        if count == 0:
+            return self.empty[KEY_BITS - depth]
+        if count == 1:
+            return self._leaves[self._keys[lo]]
+        first, last = self._keys[lo], self._keys[hi - 1]
+        branch = KEY_BITS - (first ^ last).bit_length()
+        node = (1 << branch) | (first >> (KEY_BITS - branch))
+        if dirty_lo == dirty_hi:
+            digest = self._nodes[node]
+        else:
+            middle = (first >> (KEY_BITS - 1 - branch) | 1) << (KEY_BITS - 1 - branch)
+            split = bisect_left(self._keys, middle, lo, hi)
+            dirty_split = bisect_left(dirty, middle, dirty_lo, dirty_hi)
+            left = self._rehash(branch + 1, lo, split, dirty, dirty_lo, dirty_split)
+            right = self._rehash(branch + 1, split, hi, dirty, dirty_split, dirty_hi)
+            digest = self._nodes[node] = self.node_hash(NODE_PREFIX + left + right)
+        return self._chain(digest, first, branch, depth)
+
+    def _subtree(self, depth, lo, hi):
+        return self._rehash(depth, lo, hi, (), 0, 0)
+
+    def prove(self, key):
+        """Return the proof that ``key`` has its current value, or is not set."""
+        target = int.from_bytes(key_bytes(key), "big")
+        keys = self._keys
+        lo, hi = 0, len(keys)
+        depth = base = 0
+        siblings = []
+        while hi - lo > 1:
+            middle = base + (1 << (KEY_BITS - 1 - depth))
+            split = bisect_left(keys, middle, lo, hi)
+            if target < middle:
+                siblings.append(self._subtree(depth + 1, split, hi))
+                hi = split
+            else:
+                siblings.append(self._subtree(depth + 1, lo, split))
+                lo, base = split, middle
+            depth += 1
+        leaf = None
+        if hi - lo == 1 and keys[lo] != target:
+            other = keys[lo]
+            leaf = (other.to_bytes(KEY_SIZE, "big"), self.node_hash(self._values[other]))
+        return SparseProof(siblings, leaf)
+
+    @property
+    def root(self):
+        return self._root
+
+    @property
+    def hexroot(self):
+        return self._root.hex()
+
+
+def root_from_proof(key, value, proof, hash_name="sha256"):
+    """Recompute the root implied by ``key`` having ``value`` (None for no value) and its proof."""
+    node_hash = hash_function(hash_name)
+    key = key_bytes(key)
+    depth = len(proof.siblings)
+    if depth > KEY_BITS:
+        raise ValueError("proof is deeper than the tree")
+    if value is not None:
+        if proof.leaf is not None:
+            raise ValueError("a membership proof ends in the key itself")
+        node = _leaf(node_hash, key, node_hash(value))
+    elif proof.leaf is None:
+        node = empty_hashes(hash_name)[KEY_BITS - depth]
+    else:
+        other, value_digest = proof.leaf
+        other = key_bytes(other)
+        shared = KEY_BITS - (int.from_bytes(key, "big") ^ int.from_bytes(other, "big")).bit_length()
+        if other == key or shared < depth:
+            raise ValueError("the leaf in a non-membership proof must be another key below the same path")
+        node = _leaf(node_hash, other, value_digest)
+    target = int.from_bytes(key, "big")
+    for level in reversed(range(depth)):
+        sibling = proof.siblings[level]
+        if target >> (KEY_BITS - 1 - level) & 1:
+            node = node_hash(NODE_PREFIX + sibling + node)
+        else:
+            node = node_hash(NODE_PREFIX + node + sibling)
+    return node
+
+
+def verify(key, value, proof, root, hash_name="sha256"):
+    """Check that ``key`` has ``value`` in the tree with ``root``, or is not set if ``value`` is None."""
+    try:
+        return root_from_proof(key, value, proof, hash_name) == root
+    except ValueError:
+        return False
+
+
+
+def _reference_root(items, hash_name, depth=0):
+    # Root computed from scratch by splitting the keys level by level
+    node_hash = hash_function(hash_name)
+    if not items:
+        return empty_hashes(hash_name)[KEY_BITS - depth]
+    if len(items) == 1:
+        ((key, value),) = items.items()
+        return _leaf(node_hash, key, node_hash(value))
+    bit = KEY_BITS - 1 - depth
+    left = {key: value for key, value in items.items() if not int.from_bytes(key, "big") >> bit & 1}
+    right = {key: value for key, value in items.items() if int.from_bytes(key, "big") >> bit & 1}
+    return node_hash(NODE_PREFIX + _reference_root(left, hash_name, depth + 1) + _reference_root(right, hash_name, depth + 1))
+
+
+def check(rounds=100, seed=2024, hash_name="sha256"):
+    """Check roots, proofs and the node cache over random batches of changes, raise AssertionError on a failure."""
+    rng = random.Random(seed)
+
+    def random_key():
+        # Some keys share long prefixes, to get long single-child chains
+        return bytes(29) + rng.randbytes(3) if rng.random() < 0.3 else rng.randbytes(KEY_SIZE)
+
+    tree = SparseMerkleTree(hash_name=hash_name)
+    state = {}
+    for round_ in range(rounds):
+        batch = {}
+        for _ in range(rng.randrange(1, 60)):
+            if state and rng.random() < 0.45:
+                key = rng.choice(sorted(state))
+                batch[key] = None if rng.random() < 0.7 else rng.randbytes(4)
+            else:
+                batch[random_key()] = rng.randbytes(4)
+        if round_ % 25 == 24:
+            # Now and then remove everything
+            batch = dict.fromkeys(state)
+        tree.update_many(batch)
+        for key, value in batch.items():
+            if value is None:
+                state.pop(key, None)
+            else:
+                state[key] = value
+        if tree.root != _reference_root(state, hash_name):
+            raise AssertionError(f"wrong root after round {round_}")
+        if len(tree) != len(state) or len(tree._nodes) != max(len(state) - 1, 0):
+            raise AssertionError(f"{len(tree._nodes)} cached nodes for {len(state)} keys after round {round_}")
+        for key in rng.sample(sorted(state), min(5, len(state))):
+            proof = tree.prove(key)
+            if not verify(key, state[key], proof, tree.root) or verify(key, None, proof, tree.root):
+                raise AssertionError(f"bad membership proof after round {round_}")
+        for _ in range(5):
+            key = random_key()
+            if key not in state:
+                proof = tree.prove(key)
+                if not verify(key, None, proof, tree.root) or verify(key, b"", proof, tree.root):
+                    raise AssertionError(f"bad non-membership proof after round {round_}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time building, updating and proving a sparse Merkle tree.")
+    parser.add_argument("--keys", type=int, default=1_000_000)
+    parser.add_argument("--updates", type=int, default=100_000)
+    parser.add_argument("--check", action="store_true", help="only run the checks, exit 1 on a failure")
+    args = parser.parse_args()
+    if args.check:
+        try:
+            check()
+        except AssertionError as e:
+            sys.exit(str(e))
+        sys.exit(0)
+
+    items = {os.urandom(KEY_SIZE): os.urandom(32) for _ in range(args.keys)}
+    start = time.perf_counter()
+    tree = SparseMerkleTree(items)
+    print(f"inserted {len(tree)} keys in {time.perf_counter() - start:.2f}s, root {tree.hexroot}")
+
+    existing = list(items)[:args.updates // 2]
+    batch = {key: os.urandom(32) for key in existing}
+    batch.update({os.urandom(KEY_SIZE): os.urandom(32) for _ in range(args.updates - len(existing))})
+    start = time.perf_counter()
+    tree.update_many(batch)
+    print(f"applied {len(batch)} updates in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    for key in list(batch)[:1000]:
+        assert verify(key, batch[key], tree.prove(key), tree.root)
+    missing = os.urandom(KEY_SIZE)
+    assert verify(missing, None, tree.prove(missing), tree.root)
+    print(f"1000 membership proofs in {(time.perf_counter() - start) * 1000:.1f}ms")
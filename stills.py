@@ -0,0 +1,78 @@
+import json
+import os
+import re
+
+import av
+
+from deck_html import SECTION, SLIDES_DIR, VIDEO_ATTRIBUTE, slide_files
+
+STILLS_FILE = "stills.json"
+
+VIDEO_FLAGS = re.compile(r"\s*data-background-video-(?:muted|loop)\b")
+
+
+def stills_path(name, slides_dir=SLIDES_DIR):
+    # Kept next to the slide videos so the render cache picks it up with them
+    return os.path.join(slides_dir, "files", name, STILLS_FILE)
+
+
+def write_stills(name, indices, slides_dir=SLIDES_DIR):
+    with open(stills_path(name, slides_dir), "w") as f:
+        json.dump(sorted(indices), f)
+
+
+def read_stills(name, slides_dir=SLIDES_DIR):
+    try:
+        with open(stills_path(name, slides_dir)) as f:
+            return set(json.load(f))
+    except FileNotFoundError:
+        return set()
+
+
+def extract_frame(video, image):
+    with av.open(video) as container:
+        frame = next(container.decode(video=0))
+        frame.to_image().save(image)
+
+
+def apply_stills(names, output, slides_dir=SLIDES_DIR):
+    """Show the still slides of a converted presentation as images.
+
+    Slides that only hold a frame are recorded by the scenes (see
+    MerkleTreeSlide) as a single frame video. Their frame is extracted to a
+    PNG, the slide shows it as its background image and the video is removed
+    from the assets. Expects the asset paths fixed by deck_html.fix_asset_paths().
+    Returns the number of slides changed.
+    """
+    html_dir = os.path.dirname(os.path.abspath(output))
+    slides = slide_files(names, slides_dir)
+    stills = [read_stills(name, slides_dir) for name in names]
+    with open(output) as f:
+        html = f.read()
+    sections = list(SECTION.finditer(html))
+    if len(sections) != len(slides):
+        raise ValueError(f"{output} has {len(sections)} slides, expected {len(slides)}")
+
+    parts, last, changed, videos, removable = [], 0, 0, set(), set()
+    for match, (scene_index, slide_index, _) in zip(sections, slides):
+        tag = match.group()
+        video = VIDEO_ATTRIBUTE.search(tag).group(1)
+        if slide_index in stills[scene_index]:
+            image = os.path.splitext(video)[0] + ".png"
+            extract_frame(os.path.join(html_dir, video), os.path.join(html_dir, image))
+            tag = VIDEO_FLAGS.sub("", VIDEO_ATTRIBUTE.sub(f'data-background-image="{image}"', tag))
+            removable.add(video)
+            changed += 1
+        else:
+            videos.add(video)
+        parts += [html[last:match.start()], tag]
+        last = match.end()
+    parts.append(html[last:])
+
+    with open(output, "w") as f:
+        f.write("".join(parts))
+    # Slides can share a video, only remove the ones no slide plays any more
+    for video in removable - videos:
+        if os.path.exists(os.path.join(html_dir, video)):
+            os.remove(os.path.join(html_dir, video))
+    return changed
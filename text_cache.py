@@ -0,0 +1,77 @@
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+
+import manim
+import numpy as np
+from manim import Text
+
+from render_cache import file_digest, font_file
+
+CACHE_DIR = ".text_cache"
+MAX_ENTRIES = 1024
+
+_cache = OrderedDict()
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), str(v)) for k, v in value.items()))
+    return str(value)
+
+
+def _font_digest(kwargs):
+    # The glyph outlines come from the font file the family resolves to
+    font = font_file(kwargs.get("font", ""))
+    return file_digest(font) if font else ""
+
+
+def _path(key, kwargs):
+    digest = hashlib.sha256(
+        repr((manim.__version__, np.__version__, _font_digest(kwargs), key)).encode()
+    ).hexdigest()
+    return os.path.join(CACHE_DIR, f"{digest}.pickle")
+
+
+def _load(key, kwargs):
+    try:
+        with open(_path(key, kwargs), "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        # Missing, truncated or written by other versions of the pickled classes
+        return None
+
+
+def _store(key, kwargs, mobject):
+    path = _path(key, kwargs)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(path + ".partial", "wb") as f:
+            pickle.dump(mobject, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".partial", path)
+    except (OSError, pickle.PicklingError, TypeError, AttributeError):
+        pass
+
+
+def cached_text(text, **kwargs):
+    """Drop-in for ``Text`` that lays out every distinct text only once.
+
+    Texts are keyed by their string and all keyword arguments (font, size,
+    weight, colours, ...). Repeated texts are copied from an in-memory LRU,
+    and new ones are also pickled to ``CACHE_DIR`` so later renders skip the
+    text layout and SVG parsing entirely.
+    """
+    key = (text, tuple(sorted((name, _freeze(value)) for name, value in kwargs.items())))
+    mobject = _cache.get(key)
+    if mobject is None:
+        mobject = _load(key, kwargs)
+        if mobject is None:
+            mobject = Text(text, **kwargs)
+            _store(key, kwargs, mobject)
+        _cache[key] = mobject
+        if len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(key)
+    return mobject.copy()
@@ -0,0 +1,126 @@
+import argparse
+import mmap
+import os
+import struct
+import time
+
+from merkle import MerkleTree, digest_size, hash_function, next_level
+
+# File layout: a 64 byte header followed by the digests of every level, each
+# level contiguous and the levels in level order (root first, leaves last).
+# The upper levels, which every proof reads, thus share the first pages.
+MAGIC = b"MRKLTREE"
+VERSION = 1
+# magic, version, arity, flags, digest size, leaf count, hash name
+HEADER = struct.Struct(">8sHHHHQ32s8x")
+DUPLICATE_ODD = 1
+
+
+def level_sizes(leaf_count):
+    """Number of nodes on every level of a binary tree, leaves first."""
+    sizes = [leaf_count]
+    while sizes[-1] > 1:
+        sizes.append((sizes[-1] + 1) // 2)
+    return sizes
+
+
+def layout(leaf_count, size):
+    """Return the (offset, length) of every level, leaves first, and the file size."""
+    spans = []
+    position = HEADER.size
+    for count in reversed(level_sizes(leaf_count)):
+        spans.append((position, count * size))
+        position += count * size
+    return spans[::-1], position
+
+
+def _header(leaf_count, hash_name, duplicate_odd):
+    return HEADER.pack(
+        MAGIC, VERSION, 2, DUPLICATE_ODD if duplicate_odd else 0, digest_size(hash_name), leaf_count,
+        hash_name.encode(),
+    )
+
+
+def save(tree, path):
+    """Write a MerkleTree to ``path``."""
+    with open(path + ".partial", "wb") as f:
+        f.write(_header(len(tree), tree.hash_name, tree.duplicate_odd))
+        for level in reversed(tree.levels):
+            f.write(level)
+    os.replace(path + ".partial", path)
+
+
+def build(digests, path, hash_name="sha256", duplicate_odd=False):
+    """Build the tree over a buffer of leaf digests directly in the file at ``path``.
+
+    Every level is hashed from the mapped level below it into its own place in
+    the file, so no level is ever held in memory.
+    """
+    size = digest_size(hash_name)
+    if len(digests) % size:
+        raise ValueError(f"digest buffer is not a multiple of {size} bytes")
+    leaf_count = len(digests) // size
+    spans, total = layout(leaf_count, size)
+    node_hash = hash_function(hash_name)
+    with open(path + ".partial", "w+b") as f:
+        f.write(_header(leaf_count, hash_name, duplicate_odd))
+        f.truncate(total)
+        with mmap.mmap(f.fileno(), total) as mapped:
+            view = memoryview(mapped)
+            offset, length = spans[0]
+            view[offset:offset + length] = digests
+            for (offset, length), (parent, parent_length) in zip(spans, spans[1:]):
+                next_level(view[offset:offset + length], size, node_hash,
+                           out=view[parent:parent + parent_length], duplicate_odd=duplicate_odd)
+            view.release()
+            mapped.flush()
+    os.replace(path + ".partial", path)
+
+
+def open_tree(path):
+    """Map a tree file and return it as a read-only MerkleTree.
+
+    Opening costs the same for any size: the levels are memoryviews of the
+    mapping, nothing is read until a node is accessed, and a proof only
+    touches the O(log n) pages holding its nodes. Every process that opens
+    the file shares the same page cache.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mapped) < HEADER.size:
+        raise ValueError(f"{path} is not a Merkle tree file")
+    magic, version, arity, flags, size, leaf_count, hash_name = HEADER.unpack_from(mapped)
+    hash_name = hash_name.rstrip(b"\0").decode()
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a Merkle tree file")
+    if version != VERSION or arity != 2:
+        raise ValueError(f"unsupported tree file version {version} with arity {arity}")
+    if size != digest_size(hash_name):
+        raise ValueError(f"digest size {size} does not match {hash_name}")
+    spans, total = layout(leaf_count, size)
+    if len(mapped) != total:
+        raise ValueError(f"{path} is truncated or corrupt: {len(mapped)} bytes, expected {total}")
+    if hasattr(mapped, "madvise"):
+        # Proofs jump between levels, read-ahead would only load unused pages
+        mapped.madvise(mmap.MADV_RANDOM)
+    view = memoryview(mapped)
+    levels = [view[offset:offset + length] for offset, length in spans]
+    return MerkleTree.from_levels(levels, hash_name, bool(flags & DUPLICATE_ODD))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a tree file over random leaves and time opening and proving.")
+    parser.add_argument("path")
+    parser.add_argument("--leaves", type=int, default=1 << 20)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    build(os.urandom(args.leaves * 32), args.path)
+    print(f"built {args.leaves} leaves in {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    tree = open_tree(args.path)
+    print(f"opened in {(time.perf_counter() - start) * 1000:.2f}ms, root {tree.hexroot}")
+    start = time.perf_counter()
+    for index in range(0, len(tree), max(1, len(tree) // 1000)):
+        tree.prove(index)
+    print(f"1000 proofs in {(time.perf_counter() - start) * 1000:.2f}ms")
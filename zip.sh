@@ -1,2 +1,2 @@
 #!/bin/zsh
-zip -r presentation.zip presentation.html presentation_assets
\ No newline at end of file
+python export.py presentation.html dist --prune --zip presentation.zip